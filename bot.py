@@ -1,17 +1,25 @@
 import discord
 from discord import app_commands
-from discord.ext import commands, tasks
+from discord.ext import commands
 import os
 import asyncio
 import random
 import time
 import math
+import heapq
+import itertools
+import json
+import logging
+import re
+import numpy as np
 import google.generativeai as genai
 from dotenv import load_dotenv
-from collections import defaultdict
+from collections import OrderedDict, defaultdict, deque, namedtuple
 
 # --- CONFIGURATION ---
 load_dotenv()
+log = logging.getLogger(__name__)
+
 TOKEN = os.getenv('DISCORD_TOKEN')
 API_KEY = os.getenv('API_KEY')
 
@@ -19,60 +27,603 @@ API_KEY = os.getenv('API_KEY')
 if API_KEY:
     genai.configure(api_key=API_KEY)
 
+# Game loop tuning
+LOBBY_CONCURRENCY = 64      # Max lobbies processed at once by the game loop
+LOBBY_TIMER_TIMEOUT = 10    # Seconds before a lobby's timer handler counts as overrunning
+LOOP_OVERRUN_THRESHOLD = 0.5  # Seconds of timer lag reported as an overrun
+LOOP_REPORT_INTERVAL = 300  # Seconds between loop health lines in the log
+
+# Panel rendering
+RENDER_COALESCE_WINDOW = 1.0  # Seconds to merge bursts of state changes into one edit
+RENDER_BUCKET_CAPACITY = 4    # Per-channel edit burst (Discord allows ~5 edits / 5s per channel)
+RENDER_BUCKET_RATE = 0.8      # Per-channel edits refilled per second
+# 'relative': Discord renders the countdown client-side (<t:...:R>), panels are edited only on real changes.
+# 'countdown': legacy "Time Remaining: Ns" text, refreshed every 3 seconds.
+TIMER_DISPLAY_MODE = os.getenv('TIMER_DISPLAY_MODE', 'relative')
+
+# Narration (Gemini) tuning
+NARRATION_MODEL = 'gemini-1.5-flash'
+NARRATION_TIMEOUT = 4.0     # Seconds before a model call is abandoned for a fallback line
+NARRATION_CONCURRENCY = 4   # Model calls in flight per process
+NARRATOR = os.getenv('NARRATOR', 'gemini')  # 'gemini' (needs API_KEY), 'stub' (offline canned lines) or 'off'
+NARRATION_CACHE_SIZE = 32     # (template, round bucket) intro pools kept, least recently used evicted first
+NARRATION_CACHE_TTL = 3600    # Seconds before a pool is considered stale and regenerated
+INTRO_POOL_TARGET = 8         # Intros requested per refill (one model call)
+INTRO_POOL_LOW = 3            # Refill in the background once a pool drops below this
+
+# Game panel buttons use "mafia:<channel_id>:<action>" custom IDs so one persistent view per lobby can be registered
+GAME_VIEW_ID_PREFIX = "mafia"
+
+# --- LOBBY ACTOR COMMANDS ---
+# Everything that changes a lobby's game state is posted to its inbox (MafiaBot.post) and applied
+# serially by the lobby's actor task, so interaction handlers never race a phase transition.
+# 'interaction' is the already-acknowledged interaction used for private follow-ups (None for bots/timers;
+# for prefix commands the reply goes to 'channel' instead).
+Tick = namedtuple('Tick', 'kind when')  # Due scheduler entry ('phase', 'bots', 'check', 'refresh', 'render')
+StartGame = namedtuple('StartGame', 'channel requested_by interaction', defaults=(None,))  # requested_by=None: auto-start
+CastVote = namedtuple('CastVote', 'voter_id target_id interaction', defaults=(None,))
+NightAction = namedtuple('NightAction', 'actor_id target_id interaction', defaults=(None,))
+DiscussionAction = namedtuple('DiscussionAction', 'actor_id action_type target_id interaction', defaults=(None, None))
+EndPhase = namedtuple('EndPhase', 'channel round phase interaction', defaults=(None,))  # Host's early end of round/phase
+Join = namedtuple('Join', 'user channel interaction', defaults=(None,))
+AddBots = namedtuple('AddBots', 'count mode channel interaction', defaults=(None,))
+SetFastForward = namedtuple('SetFastForward', 'enabled channel interaction', defaults=(None,))
+
 # Intents
 intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
 
+class PhaseScheduler:
+    """
+    Deadline heap for lobby timers.
+
+    Entries are (when, seq, channel_id, kind). Nothing is ever removed: the
+    game loop validates an entry when it fires (it only counts if it is still
+    the lobby's current timer of its kind, see GameLobby.is_live_tick), so
+    rescheduling is a single push and lobbies with no pending timers cost
+    nothing.
+    """
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def schedule(self, channel_id, when, kind):
+        """Queue a timer; wakes the loop early if this is the new earliest deadline."""
+        entry = (when, next(self._seq), channel_id, kind)
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry:
+            self._wakeup.set()
+
+    def next_deadline(self):
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now=None):
+        """Pop every entry whose deadline has passed, earliest first."""
+        now = time.time() if now is None else now
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            when, _, channel_id, kind = heapq.heappop(self._heap)
+            due.append((when, channel_id, kind))
+        return due
+
+    async def wait_due(self):
+        """Sleep until the earliest deadline (or an earlier one is scheduled) and return what's due."""
+        while True:
+            due = self.pop_due()
+            if due:
+                return due
+            self._wakeup.clear()
+            deadline = self.next_deadline()
+            timeout = None if deadline is None else max(0, deadline - time.time())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+class TokenBucket:
+    """Per-channel edit budget so panel edits stay under Discord's per-route rate limits."""
+    def __init__(self, capacity=RENDER_BUCKET_CAPACITY, rate=RENDER_BUCKET_RATE):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self):
+        """Spend a token if one is available."""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def take(self):
+        """Spend a token unconditionally (real announcements always go out; later edits wait longer)."""
+        self._refill()
+        self.tokens -= 1
+
+    def wait_time(self):
+        """Seconds until a token is available."""
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+class RenderScheduler:
+    """
+    Dirty-tracked panel edits.
+
+    Lobbies bump their state_version and ask for a 'render' tick; bursts of
+    changes inside RENDER_COALESCE_WINDOW become one edit. An edit is skipped
+    when the serialized embed matches what was last sent to that message, and
+    deferred when the channel's token bucket is empty.
+    """
+    def __init__(self):
+        self.buckets = {}           # channel_id -> TokenBucket
+        self.last_payload = {}      # channel_id -> (message id, serialized embed) last sent
+        self.rendered_version = {}  # channel_id -> lobby.state_version shown on the panel
+        self.edits = 0
+        self.skipped = 0
+        self.deferred = 0
+
+    def forget(self, channel_id):
+        """Drop everything tracked for a channel whose lobby is gone."""
+        self.buckets.pop(channel_id, None)
+        self.last_payload.pop(channel_id, None)
+        self.rendered_version.pop(channel_id, None)
+
+    def bucket(self, channel_id):
+        bucket = self.buckets.get(channel_id)
+        if bucket is None:
+            bucket = self.buckets[channel_id] = TokenBucket()
+        return bucket
+
+    @staticmethod
+    def serialize(embed):
+        return json.dumps(embed.to_dict(), sort_keys=True)
+
+    def record_sent(self, lobby, embed):
+        """Note a panel sent/edited outside the scheduler (phase announcements)."""
+        message = lobby.last_message
+        self.last_payload[lobby.channel_id] = (getattr(message, 'id', None), self.serialize(embed))
+        self.rendered_version[lobby.channel_id] = lobby.state_version
+        self.bucket(lobby.channel_id).take()
+
+    async def flush(self, lobby):
+        """Edit the lobby's panel if its embed changed and the channel has edit budget."""
+        message = lobby.last_message
+        if not message:
+            return False
+        channel_id = lobby.channel_id
+        version = lobby.state_version
+        embed = lobby.render_embed()
+        payload = (getattr(message, 'id', None), self.serialize(embed))
+        if payload == self.last_payload.get(channel_id):
+            self.skipped += 1
+            self.rendered_version[channel_id] = version
+            return False
+        bucket = self.bucket(channel_id)
+        if not bucket.try_take():
+            self.deferred += 1
+            lobby.schedule_tick('render', time.time() + bucket.wait_time())
+            return False
+        try:
+            await message.edit(embed=embed, view=lobby.get_view())
+        except:
+            return False  # Message might be deleted
+        self.last_payload[channel_id] = payload
+        self.rendered_version[channel_id] = version
+        self.edits += 1
+        return True
+
+
+# Dawn intros used when the model is slow, failing or not configured
+FALLBACK_INTROS = [
+    "The sun rises on a town gripped by paranoia.",
+    "Dawn breaks cold and grey, and the town counts its dead.",
+    "Morning fog rolls in, hiding the footprints of last night's killer.",
+    "The church bell rings once: another neighbor won't be answering.",
+    "Coffee goes cold on every porch as the news spreads from door to door.",
+    "Someone in this town slept well last night. That's the problem.",
+]
+
+
+class GeminiClient:
+    """Blocking google-generativeai client; the Narrator runs it in a worker thread."""
+    def __init__(self, model_name=NARRATION_MODEL):
+        self.model = genai.GenerativeModel(model_name)
+
+    def generate(self, prompt):
+        return self.model.generate_content(prompt).text.strip()
+
+
+class StubNarrationClient:
+    """Offline stand-in for GeminiClient: canned lines, with optional latency or failure."""
+    def __init__(self, lines=None, delay=0.0, fail=False):
+        self.lines = list(lines or ["[stub] A body is found at dawn."])
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def generate(self, prompt):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)  # Runs in a worker thread, like the real client
+        if self.fail:
+            raise RuntimeError("stub narration failure")
+        return self.lines[(self.calls - 1) % len(self.lines)]
+
+
+def make_narration_client():
+    """Pick the narration backend from NARRATOR (None means fallback lines only)."""
+    if NARRATOR == 'stub':
+        return StubNarrationClient()
+    if NARRATOR == 'gemini' and API_KEY:
+        return GeminiClient()
+    return None
+
+
+# Round buckets for dawn narration: intros are cached per stage of the game, not per exact day
+INTRO_STAGES = [(2, "the first days"), (4, "the middle days"), (None, "the final days")]
+LIST_MARKER = re.compile(r'^\s*(?:[-*•]|\d+[.)])\s*')  # "1." / "2)" / "-" numbering the model may put on each line
+DAWN_INTRO_TEMPLATE = (
+    "Write {count} different 1-sentence gritty noir intros for a morning in {stage} of a mafia game, "
+    "right after a fresh murder. One per line, no numbering."
+)
+
+
+def intro_stage(day):
+    """Round bucket for a day number."""
+    for last_day, stage in INTRO_STAGES:
+        if last_day is None or day <= last_day:
+            return stage
+
+
+class NarrationCache:
+    """LRU map with a TTL: key -> value, dropping the oldest keys past `maxsize` and entries older than `ttl`."""
+    def __init__(self, maxsize=NARRATION_CACHE_SIZE, ttl=NARRATION_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (stored_at, value)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, now=None):
+        now = time.time() if now is None else now
+        entry = self._entries.get(key)
+        if entry is None or now - entry[0] > self.ttl:
+            if entry is not None:
+                del self._entries[key]  # Expired
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, value, now=None):
+        self._entries[key] = (time.time() if now is None else now, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class Narrator:
+    """
+    Async narration service.
+
+    Model calls run off the event loop (asyncio.to_thread), at most
+    `concurrency` at a time, and are abandoned after `timeout` seconds.
+    Dawn intros are served from per-process pools (one per template and
+    round bucket, held in a NarrationCache) that are refilled in the
+    background with one batched model call, so resolving a night never
+    waits on the model; an empty pool falls back to FALLBACK_INTROS.
+    """
+    def __init__(self, client=None, timeout=NARRATION_TIMEOUT, concurrency=NARRATION_CONCURRENCY,
+                 cache=None, pool_target=INTRO_POOL_TARGET, pool_low=INTRO_POOL_LOW):
+        self.client = client
+        self.timeout = timeout
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.cache = cache if cache is not None else NarrationCache()
+        self.pool_target = pool_target
+        self.pool_low = pool_low
+        self.refills = {}  # key -> Task refilling that pool
+        self.rng = random.Random()
+        self.calls = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.fallbacks = 0
+
+    def fallback(self):
+        self.fallbacks += 1
+        return self.rng.choice(FALLBACK_INTROS)
+
+    async def _call(self, prompt):
+        async with self.semaphore:
+            self.calls += 1
+            return await asyncio.to_thread(self.client.generate, prompt)
+
+    async def _model_text(self, prompt):
+        """Model text for the prompt, or None if it is slow, fails or is unavailable."""
+        if self.client is None:
+            return None
+        try:
+            # The timeout covers waiting for a slot too; an abandoned thread finishes in the background
+            return await asyncio.wait_for(self._call(prompt), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+        except Exception as e:
+            self.failures += 1
+            log.warning("Narration failed: %s", e)
+        return None
+
+    def _pool(self, key):
+        pool = self.cache.get(key)
+        if pool is None:
+            pool = deque()
+            self.cache.put(key, pool)
+        return pool
+
+    def prefetch(self, day):
+        """Make sure the pool for `day`'s round bucket is stocked (refills in the background)."""
+        key = (DAWN_INTRO_TEMPLATE, intro_stage(day))
+        if len(self._pool(key)) < self.pool_low:
+            self._refill(key)
+
+    def warm(self):
+        """Stock every round bucket's pool (at startup, so the first dawns are covered)."""
+        for _, stage in INTRO_STAGES:
+            key = (DAWN_INTRO_TEMPLATE, stage)
+            if len(self._pool(key)) < self.pool_low:
+                self._refill(key)
+
+    def dawn_intro(self, day):
+        """A dawn intro for `day`, without waiting: pooled model text, else a fallback line."""
+        key = (DAWN_INTRO_TEMPLATE, intro_stage(day))
+        pool = self._pool(key)
+        text = pool.popleft() if pool else None
+        if len(pool) < self.pool_low:
+            self._refill(key)
+        return text or self.fallback()
+
+    def _refill(self, key):
+        if self.client is None:
+            return
+        task = self.refills.get(key)
+        if task is not None and not task.done():
+            return
+        try:
+            self.refills[key] = asyncio.get_running_loop().create_task(self._fill(key))
+        except RuntimeError:
+            pass  # No event loop (offline use): fallback lines only
+
+    async def _fill(self, key):
+        template, stage = key
+        text = await self._model_text(template.format(count=self.pool_target, stage=stage))
+        if not text:
+            return
+        lines = [LIST_MARKER.sub('', line).strip() for line in text.splitlines()]
+        pool = self._pool(key)
+        pool.extend([line for line in lines if line][:self.pool_target])
+        self.cache.put(key, pool)  # A fresh batch restarts the pool's TTL
+
+
+class LoopMetrics:
+    """Game loop health: how late timers fire, how long handlers take, and timeouts."""
+    def __init__(self, overrun_threshold=LOOP_OVERRUN_THRESHOLD):
+        self.overrun_threshold = overrun_threshold
+        self.timers_run = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.overruns = 0
+        self.timeouts = 0
+        self.max_handler_time = 0.0
+
+    def record_lag(self, lag):
+        """Record how late a timer fired relative to its deadline. Returns True on overrun."""
+        self.timers_run += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+        if lag > self.overrun_threshold:
+            self.overruns += 1
+            return True
+        return False
+
+    def record_handler(self, duration):
+        self.max_handler_time = max(self.max_handler_time, duration)
+
+    def snapshot(self):
+        return {
+            'timers_run': self.timers_run,
+            'avg_lag': self.total_lag / self.timers_run if self.timers_run else 0.0,
+            'max_lag': self.max_lag,
+            'overruns': self.overruns,
+            'timeouts': self.timeouts,
+            'max_handler_time': self.max_handler_time,
+        }
+
+
 class MafiaBot(commands.Bot):
     def __init__(self):
         super().__init__(command_prefix="!", intents=intents)
         self.lobbies = {}  # channel_id -> GameLobby
         self.lobbies_lock = asyncio.Lock()
+        self.scheduler = PhaseScheduler()  # Phase deadlines, panel refreshes and bot ticks
+        self.game_loop_task = None
+        self.loop_metrics = LoopMetrics()
+        self.last_loop_report = time.time()
+        self.timer_semaphore = asyncio.Semaphore(LOBBY_CONCURRENCY)
+        self.lobby_tasks = {}  # channel_id -> actor Task applying that lobby's queued commands
+        self.inboxes = defaultdict(deque)  # channel_id -> deque of pending commands (Tick, CastVote, ...)
+        self.renderer = RenderScheduler()  # Coalesced, rate-limited panel edits
+        self.narrator = Narrator(make_narration_client())  # Off-loop Gemini narration with fallbacks
 
     async def setup_hook(self):
         await self.tree.sync()
-        self.game_loop.start()
+        # Re-register the views of lobbies that already exist (e.g. after a reconnect)
+        for lobby in self.lobbies.values():
+            self.add_view(lobby.get_view())
+        self.narrator.warm()
+        self.game_loop_task = asyncio.create_task(self.game_loop())
+
+    def add_lobby(self, lobby):
+        """Register a lobby, its persistent game view, and hook its timers into the scheduler."""
+        self.lobbies[lobby.channel_id] = lobby
+        lobby.renderer = self.renderer
+        lobby.narrator = self.narrator
+        lobby.attach_scheduler(self.scheduler)
+        self.add_view(lobby.get_view())
+
+    def remove_lobby(self, channel_id):
+        """Unregister a lobby, stop its game view so its buttons stop dispatching, and drop its channel state."""
+        lobby = self.lobbies.pop(channel_id, None)
+        if lobby is not None and lobby.view is not None:
+            lobby.view.stop()  # Also drops it from the persistent view store
+        inbox = self.inboxes.pop(channel_id, None)
+        if inbox:
+            inbox.clear()  # Commands queued for this game must not reach a new lobby in the channel
+        self.lobby_tasks.pop(channel_id, None)  # A running actor finishes its current command and exits
+        self.renderer.forget(channel_id)
+        return lobby
+
+    async def on_interaction(self, interaction):
+        """Answer clicks on game panels whose lobby no longer exists (ended, or lost in a restart)."""
+        data = interaction.data or {}
+        custom_id = data.get('custom_id', '')
+        if interaction.type != discord.InteractionType.component or not custom_id.startswith(GAME_VIEW_ID_PREFIX + ":"):
+            return
+        try:
+            channel_id = int(custom_id.split(":", 2)[1])
+        except (IndexError, ValueError):
+            return
+        if channel_id in self.lobbies or interaction.response.is_done():
+            return  # The lobby's registered view handles it
+        try:
+            await interaction.response.send_message(
+                "🏁 This game is no longer running. Use `/mafia_create` to start a new one.", ephemeral=True
+            )
+        except discord.HTTPException:
+            pass
 
-    @tasks.loop(seconds=1)
     async def game_loop(self):
-        """Main Game Loop: Checks timers and auto-advances phases."""
-        current_time = time.time()
-        # Create a copy of keys to avoid modification during iteration issues
-        for channel_id in list(self.lobbies.keys()):
+        """Main Game Loop: sleeps until the next lobby deadline, then fans due lobbies out as tasks."""
+        while True:
+            due = await self.scheduler.wait_due()
+            woke_at = time.time()
+            for when, channel_id, kind in due:
+                if self.loop_metrics.record_lag(woke_at - when):
+                    log.warning("Loop overrun: %s timer for lobby %s fired %.2fs late", kind, channel_id, woke_at - when)
+                self.dispatch_timer(channel_id, when, kind)
+            self.report_loop_health(woke_at)
+
+    def report_loop_health(self, now=None):
+        """Log the loop metrics at most every LOOP_REPORT_INTERVAL seconds; returns the snapshot when it logged."""
+        now = time.time() if now is None else now
+        if now - self.last_loop_report < LOOP_REPORT_INTERVAL:
+            return None
+        self.last_loop_report = now
+        stats = self.loop_metrics.snapshot()
+        log.info("Loop health: %s", ", ".join(f"{key}={value:.3g}" for key, value in stats.items()))
+        return stats
+
+    def dispatch_timer(self, channel_id, when, kind):
+        """Queue a due timer on its lobby's inbox."""
+        self.post(channel_id, Tick(kind, when))
+
+    def post(self, channel_id, command):
+        """Queue a command on a lobby's inbox, starting the lobby's actor task if it is idle."""
+        self.inboxes[channel_id].append(command)
+        task = self.lobby_tasks.get(channel_id)
+        if task is None or task.done():
+            self.lobby_tasks[channel_id] = asyncio.create_task(self._run_lobby(channel_id))
+
+    async def _run_lobby(self, channel_id):
+        """
+        The lobby actor: apply one lobby's queued commands in order.
+
+        Lobbies run concurrently (bounded by timer_semaphore) but each lobby's
+        commands stay serial, so a slow Discord call only delays its own lobby
+        and no vote or action can land half-way through a phase transition.
+        The task exits once the inbox is empty; post() starts a new one.
+        """
+        inbox = self.inboxes[channel_id]
+        while inbox:
+            command = inbox.popleft()
             lobby = self.lobbies.get(channel_id)
-            if not lobby or lobby.status != 'in-game':
+            if not lobby:
                 continue
+            if isinstance(command, Tick):
+                if lobby.status != 'in-game':
+                    continue
+                label = command.kind
+                coro = self.handle_timer(lobby, command.kind, command.when)
+            else:
+                label = type(command).__name__
+                coro = lobby.handle_command(command, self)
+            started = time.time()
+            async with self.timer_semaphore:
+                handler = asyncio.ensure_future(coro)
+                done, _ = await asyncio.wait({handler}, timeout=LOBBY_TIMER_TIMEOUT)
+            try:
+                if not done:
+                    # Phase transitions are never cancelled half-way: the overrunning handler
+                    # finishes off the semaphore, so its slot goes to other lobbies meanwhile
+                    self.loop_metrics.timeouts += 1
+                    log.warning("Lobby %s %s command exceeded %ss", channel_id, label, LOBBY_TIMER_TIMEOUT)
+                    await handler
+                handler.result()
+            except Exception:
+                log.exception("Command %s failed for lobby %s", label, channel_id)
+            self.loop_metrics.record_handler(time.time() - started)
+        if self.inboxes.get(channel_id) is inbox:  # Not replaced by remove_lobby meanwhile
+            del self.inboxes[channel_id]
+
+    async def handle_timer(self, lobby, kind, when):
+        """Run one due timer for a lobby, ignoring entries that have been superseded."""
+        if not lobby.is_live_tick(kind, when):
+            return
+        current_time = time.time()
 
-            # Handle auto bot actions
-            if lobby.bot_mode == 'auto':
-                await lobby.process_auto_bot_actions(self)
-            
-            # Check for early phase advancement (discussion with all actions complete)
-            should_advance = False
-            if current_time >= lobby.phase_end_time:
-                should_advance = True
-            elif lobby.phase == 'discussion' and lobby.should_auto_advance_discussion():
-                should_advance = True
-            
-            if should_advance:
+        if kind == 'phase':
+            await lobby.advance_phase(self)
+            # Deadline still passed (e.g. channel unavailable): retry like the old 1s poll
+            if lobby.status == 'in-game' and lobby.phase_end_time <= time.time():
+                lobby.schedule_tick('phase', time.time() + 1)
+
+        elif kind == 'bots':
+            # Re-arms itself for the next planned bot action; nothing runs between them
+            await lobby.process_auto_bot_actions(self)
+            if lobby._check_phase_completion():
                 await lobby.advance_phase(self)
-            else:
+
+        elif kind == 'check':
+            # Early phase advancement: every required night action / discussion action / vote is in
+            if lobby._check_phase_completion():
+                await lobby.advance_phase(self)
+
+        elif kind in ('refresh', 'render'):
+            if kind == 'refresh' and lobby.timer_display == 'countdown':
                 # Update display every 3 seconds to show timer changes (EDIT message, don't send new)
-                if not hasattr(lobby, 'last_display_update'):
-                    lobby.last_display_update = 0
-                
-                if current_time - lobby.last_display_update >= 3:
-                    lobby.last_display_update = current_time
-                    channel = self.get_channel(lobby.channel_id)
-                    if channel and lobby.last_message:
-                        # Edit the existing message to update timer
-                        embed = lobby.render_embed()
-                        view = GameView(lobby)
-                        try:
-                            await lobby.last_message.edit(embed=embed, view=view)
-                        except:
-                            pass  # Message might be deleted
+                lobby.schedule_tick('refresh', current_time + 3)
+            try:
+                # Panel edits are safe to drop, so a slow edit is cut off instead of stalling the lobby
+                await asyncio.wait_for(self.renderer.flush(lobby), LOBBY_TIMER_TIMEOUT)
+            except asyncio.TimeoutError:
+                self.loop_metrics.timeouts += 1
 
 bot = MafiaBot()
 
@@ -114,6 +665,49 @@ WEIGHTS = {
     'INTUITION_LEAK': 0.15,  # Detective intuition spreads to others
 }
 
+# Optional tuned weights (tuner.py output); keys it sets override the defaults above
+WEIGHTS_PROFILE = os.getenv('WEIGHTS_PROFILE')
+
+
+def load_weights_profile(path, weights=WEIGHTS):
+    """Update `weights` in place from a JSON profile, ignoring keys the engine does not know."""
+    with open(path) as f:
+        profile = json.load(f)
+    unknown = sorted(set(profile) - set(weights))
+    if unknown:
+        print(f"[DEBUG] Ignoring unknown weights in {path}: {', '.join(unknown)}")
+    weights.update({k: float(v) for k, v in profile.items() if k in weights})
+    return weights
+
+
+if WEIGHTS_PROFILE:
+    load_weights_profile(WEIGHTS_PROFILE)
+
+# Role assignment: max(1, players // mafia_divisor) mafia, plus a doctor and a detective from these sizes on
+ROLE_SETUP = {
+    'mafia_divisor': 3,
+    'doctor_min_players': 4,
+    'detective_min_players': 5,
+}
+
+# Auto-bot policy: bots act on their own suspicion row (see GameLobby.plan_bot_actions)
+BOT_POLICY = {
+    'TOP_K': 2,        # Night/discussion picks among this many top suspects, so like-minded bots don't move in lockstep
+    'ACCUSE_AT': 45,   # Accuse the picked suspect in discussion from this suspicion up
+    'DEFEND_AT': 25,   # Otherwise defend the most trusted player at or below this
+    'VOTE_AT': BASELINE_SUSPICION,  # Town skips the vote when no pick looks worse than a stranger
+    'CONSENSUS': 0.5,  # Share of a vote's score taken from the room's average suspicion rather than the bot's own
+}
+
+# Auto-bot reaction times: phase -> (median seconds, log-normal spread), drawn once per bot per phase
+BOT_ACTION_DELAY = {
+    'night': (5.0, 0.5),
+    'discussion': (20.0, 0.6),
+    'voting': (6.0, 0.5),
+}
+BOT_ACTION_MIN_DELAY = 1.0      # Nobody reacts instantly
+BOT_ACTION_DEADLINE_SHARE = 0.8  # ...and every bot acts before this share of the phase has passed
+
 # Bot names for testing
 BOT_NAMES = [
     "Detector", "Healer", "Shadow", "Echo", "Cipher",
@@ -147,43 +741,640 @@ class Player:
         self.night_actions = []  # History of night actions
 
 
-class SuspicionMatrix:
-    """Core data structure representing who suspects whom."""
-    def __init__(self):
-        self.matrix = defaultdict(lambda: defaultdict(float))
-    
+class PlayerRoster(dict):
+    """
+    The lobby's player_id -> Player dict.
+
+    Bumps `version` whenever a player is added, replaced or removed, and
+    caches the sorted index <-> ID mapping used by select menus, so
+    encoding and decoding menu values is O(1) until the roster changes.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+        self._cached_version = -1
+        self._ids = []
+        self._index_of = {}
+
+    def _changed(self):
+        self.version += 1
+
+    def __setitem__(self, player_id, player):
+        super().__setitem__(player_id, player)
+        self._changed()  # Also on replacement: renders keyed on the version must see the new Player
+
+    def __delitem__(self, player_id):
+        super().__delitem__(player_id)
+        self._changed()
+
+    def pop(self, *args):
+        result = super().pop(*args)
+        self._changed()
+        return result
+
+    def popitem(self):
+        result = super().popitem()
+        self._changed()
+        return result
+
+    def setdefault(self, player_id, default=None):
+        if player_id not in self:
+            self._changed()
+        return super().setdefault(player_id, default)
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._changed()
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def _refresh_index(self):
+        if self._cached_version != self.version:
+            self._ids = sorted(self.keys())
+            self._index_of = {pid: i for i, pid in enumerate(self._ids)}
+            self._cached_version = self.version
+
+    def index_of(self, player_id):
+        """Stable menu index for a player, or -1."""
+        self._refresh_index()
+        return self._index_of.get(player_id, -1)
+
+    def id_at(self, index):
+        """Player ID for a menu index, or None if out of range."""
+        self._refresh_index()
+        if 0 <= index < len(self._ids):
+            return self._ids[index]
+        return None
+
+
+class DenseSuspicionMatrix:
+    """
+    Dense suspicion storage backed by a contiguous float32 NumPy array.
+
+    Each lobby's players are mapped to compact row/column indices; unset cells
+    hold NaN and read back as the requested default, so a missing pair never
+    creates an entry.
+
+    Memory decay is lazy: the matrix keeps a decay epoch, every cell remembers
+    the epoch it was written in, and reads apply the closed form
+    baseline + (v - baseline) * decay^k for the k epochs that passed since.
+
+    Column aggregates are kept up to date on every write. Each cell
+    contributes (v - baseline) * decay^-stamp to its target's running sum, so
+    the current average is baseline + decay^epoch * sum / count, so one
+    target's average is O(1) and column_means ranks every target without
+    scanning the matrix. Decay scales every average by the same factor and
+    never reorders targets, which lets lazy heaps answer most/least suspected
+    queries in O(log n).
+    """
+    REBASE_EPOCH = 256  # Fold elapsed decay into the stored values before decay^-epoch gets large
+
+    def __init__(self, player_ids=(), decay=None, baseline=BASELINE_SUSPICION):
+        self.decay = WEIGHTS['MEMORY_DECAY'] if decay is None else decay
+        self.baseline = baseline
+        self.epoch = 0
+        self.index = {}  # player_id -> row/column
+        self.ids = []    # row/column -> player_id
+        self.values = np.full((0, 0), np.nan, dtype=np.float32)
+        self.stamps = np.zeros((0, 0), dtype=np.int32)  # epoch each cell was last written
+        self.col_sum = np.zeros(0, dtype=np.float64)    # per-target sum of scaled deviations
+        self.col_count = np.zeros(0, dtype=np.int64)    # per-target number of set cells
+        self.col_version = np.zeros(0, dtype=np.int64)  # bumps invalidate heap entries
+        self._max_heap = []  # (-rank, version, column)
+        self._min_heap = []  # (rank, version, column)
+        for pid in player_ids:
+            self._ensure(pid)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _ensure(self, player_id):
+        """Return the index for a player, growing the arrays if needed."""
+        idx = self.index.get(player_id)
+        if idx is not None:
+            return idx
+        idx = len(self.ids)
+        capacity = self.values.shape[0]
+        if idx >= capacity:
+            # Grow geometrically so late joiners stay amortized O(1)
+            new_capacity = max(8, capacity * 2)
+            grown = np.full((new_capacity, new_capacity), np.nan, dtype=np.float32)
+            grown[:capacity, :capacity] = self.values
+            self.values = grown
+            grown_stamps = np.zeros((new_capacity, new_capacity), dtype=np.int32)
+            grown_stamps[:capacity, :capacity] = self.stamps
+            self.stamps = grown_stamps
+            self.col_sum = np.concatenate([self.col_sum, np.zeros(new_capacity - capacity)])
+            self.col_count = np.concatenate([self.col_count, np.zeros(new_capacity - capacity, dtype=np.int64)])
+            self.col_version = np.concatenate([self.col_version, np.zeros(new_capacity - capacity, dtype=np.int64)])
+        self.index[player_id] = idx
+        self.ids.append(player_id)
+        return idx
+
+    def _decayed(self, values, stamps):
+        """Apply the epochs elapsed since each cell was written (NaN stays NaN)."""
+        factor = np.power(self.decay, self.epoch - stamps)
+        return self.baseline + (values.astype(np.float64) - self.baseline) * factor
+
+    def _contribution(self, values, stamps):
+        """A cell's share of its column sum, expressed at epoch 0."""
+        return (np.asarray(values, dtype=np.float64) - self.baseline) * np.power(self.decay, -np.asarray(stamps, dtype=np.float64))
+
+    def _rank(self, j):
+        return self.col_sum[j] / self.col_count[j]
+
+    def _push_column(self, j):
+        """Record column j's new rank; older heap entries for it become stale."""
+        self.col_version[j] += 1
+        if self.col_count[j]:
+            rank = float(self._rank(j))
+            version = int(self.col_version[j])
+            heapq.heappush(self._max_heap, (-rank, version, j))
+            heapq.heappush(self._min_heap, (rank, version, j))
+            if len(self._max_heap) > 4 * len(self.ids) + 64:
+                self._rebuild_heaps()
+
+    def _rebuild_heaps(self):
+        live = [j for j in range(len(self.ids)) if self.col_count[j]]
+        self._max_heap = [(-float(self._rank(j)), int(self.col_version[j]), j) for j in live]
+        self._min_heap = [(float(self._rank(j)), int(self.col_version[j]), j) for j in live]
+        heapq.heapify(self._max_heap)
+        heapq.heapify(self._min_heap)
+
+    def _rebuild_aggregates(self):
+        """Recompute column sums/counts from scratch (used after bulk writes)."""
+        n = len(self.ids)
+        values = self.values[:n, :n]
+        contributions = self._contribution(values, self.stamps[:n, :n])
+        self.col_sum[:n] = np.nansum(contributions, axis=0)
+        self.col_count[:n] = (~np.isnan(values)).sum(axis=0)
+        self.col_version[:n] += 1
+        self._rebuild_heaps()
+
+    def reset(self, player_ids):
+        """Drop all values and re-map the given players to indices 0..n-1."""
+        n = len(player_ids)
+        self.epoch = 0
+        self.index = {pid: i for i, pid in enumerate(player_ids)}
+        self.ids = list(player_ids)
+        self.values = np.full((n, n), np.nan, dtype=np.float32)
+        self.stamps = np.zeros((n, n), dtype=np.int32)
+        self.col_sum = np.zeros(n, dtype=np.float64)
+        self.col_count = np.zeros(n, dtype=np.int64)
+        self.col_version = np.zeros(n, dtype=np.int64)
+        self._max_heap = []
+        self._min_heap = []
+
+    def initialize(self, player_ids, mafia_mask, noise):
+        """
+        Vectorized start-of-game fill.
+
+        Everyone starts at baseline + noise; mafia members know each other
+        (EPSILON); the diagonal stays unset.
+        """
+        self.reset(player_ids)
+        n = len(player_ids)
+        if not n:
+            return
+        block = np.clip(self.baseline + np.asarray(noise, dtype=np.float64), EPSILON, 100 - EPSILON)
+        mafia_mask = np.asarray(mafia_mask, dtype=bool)
+        block[np.ix_(mafia_mask, mafia_mask)] = EPSILON
+        np.fill_diagonal(block, np.nan)
+        self.values[:n, :n] = block
+        self._rebuild_aggregates()
+
+    def advance_epoch(self, steps=1):
+        """Decay every cell toward baseline by `steps` rounds in O(1)."""
+        self.epoch += steps
+        if self.epoch >= self.REBASE_EPOCH:
+            n = len(self.ids)
+            self.values[:n, :n] = self._decayed(self.values[:n, :n], self.stamps[:n, :n])
+            self.stamps[:n, :n] = 0
+            self.epoch = 0
+            self._rebuild_aggregates()
+
     def get(self, observer_id, target_id, default=BASELINE_SUSPICION):
         """Get suspicion value (0-100)."""
         if observer_id == target_id:
             return None  # Can't suspect yourself
-        return self.matrix[observer_id][target_id] if self.matrix[observer_id][target_id] != 0 else default
-    
+        i = self.index.get(observer_id)
+        j = self.index.get(target_id)
+        if i is None or j is None:
+            return default
+        value = float(self.values[i, j])
+        if math.isnan(value):
+            return default
+        elapsed = self.epoch - int(self.stamps[i, j])
+        if elapsed:
+            value = self.baseline + (value - self.baseline) * self.decay ** elapsed
+        return value
+
     def set(self, observer_id, target_id, value):
         """Set suspicion value with clamping."""
         if observer_id == target_id:
             return
-        self.matrix[observer_id][target_id] = max(EPSILON, min(100 - EPSILON, value))
-    
+        i = self._ensure(observer_id)
+        j = self._ensure(target_id)
+        old = float(self.values[i, j])
+        if math.isnan(old):
+            self.col_count[j] += 1
+        else:
+            self.col_sum[j] -= (old - self.baseline) * self.decay ** -int(self.stamps[i, j])
+        self.values[i, j] = max(EPSILON, min(100 - EPSILON, value))
+        self.stamps[i, j] = self.epoch
+        self.col_sum[j] += (float(self.values[i, j]) - self.baseline) * self.decay ** -self.epoch
+        self._push_column(j)
+
+    def get_column(self, observer_ids, target_id, default=BASELINE_SUSPICION):
+        """Get suspicion values of many observers toward one target as a float64 array."""
+        out = np.full(len(observer_ids), default, dtype=np.float64)
+        j = self.index.get(target_id)
+        if j is None:
+            return out
+        rows = np.fromiter((self.index.get(o, -1) for o in observer_ids), dtype=np.intp, count=len(observer_ids))
+        known = rows >= 0
+        values = self._decayed(self.values[rows[known], j], self.stamps[rows[known], j])
+        out[known] = np.where(np.isnan(values), default, values)
+        return out
+
+    def set_column(self, observer_ids, target_id, values):
+        """Set many observers' suspicion of one target at once (clamped)."""
+        j = self._ensure(target_id)
+        rows = np.fromiter((self._ensure(o) for o in observer_ids), dtype=np.intp, count=len(observer_ids))
+        old = self.values[rows, j]
+        was_set = ~np.isnan(old)
+        self.col_sum[j] -= self._contribution(old[was_set], self.stamps[rows[was_set], j]).sum()
+        self.col_count[j] += len(rows) - int(was_set.sum())
+        self.values[rows, j] = np.clip(values, EPSILON, 100 - EPSILON)
+        self.stamps[rows, j] = self.epoch
+        self.col_sum[j] += self._contribution(self.values[rows, j], self.epoch).sum()
+        self._push_column(j)
+
     def get_all_for_observer(self, observer_id):
         """Get all suspicion values for an observer."""
-        return dict(self.matrix[observer_id])
-    
+        i = self.index.get(observer_id)
+        if i is None:
+            return {}
+        n = len(self.ids)
+        row = self._decayed(self.values[i, :n], self.stamps[i, :n])
+        return {self.ids[j]: float(row[j]) for j in np.flatnonzero(~np.isnan(row))}
+
     def get_average_suspicion(self, target_id, exclude_id=None):
-        """Get average suspicion across all observers."""
-        values = []
-        for obs_id in self.matrix:
-            if exclude_id and obs_id == exclude_id:
+        """Get average suspicion across all observers (O(1) from the column aggregates)."""
+        j = self.index.get(target_id)
+        if j is None:
+            return self.baseline
+        total = self.col_sum[j]
+        count = int(self.col_count[j])
+        i = self.index.get(exclude_id) if exclude_id is not None else None
+        if i is not None and not np.isnan(self.values[i, j]):
+            total -= (float(self.values[i, j]) - self.baseline) * self.decay ** -int(self.stamps[i, j])
+            count -= 1
+        if count <= 0:
+            return self.baseline
+        return float(self.baseline + self.decay ** self.epoch * total / count)
+
+    def _extreme(self, heap, sign, candidates):
+        """Pop stale entries off a lazy heap and return the best live target."""
+        held = []
+        found = None
+        while heap:
+            key, version, j = heap[0]
+            if version != self.col_version[j]:
+                heapq.heappop(heap)  # Stale: the column changed since this entry
+                continue
+            if candidates is not None and self.ids[j] not in candidates:
+                held.append(heapq.heappop(heap))
                 continue
-            if target_id in self.matrix[obs_id] and self.matrix[obs_id][target_id] != 0:
-                values.append(self.matrix[obs_id][target_id])
-        return sum(values) / len(values) if values else BASELINE_SUSPICION
+            found = (self.ids[j], float(self.baseline + self.decay ** self.epoch * sign * key))
+            break
+        for entry in held:
+            heapq.heappush(heap, entry)
+        return found
+
+    def most_suspected(self, candidates=None):
+        """(player_id, average suspicion) of the town's top suspect, or None."""
+        return self._extreme(self._max_heap, -1, candidates)
+
+    def least_suspected(self, candidates=None):
+        """(player_id, average suspicion) of the town's most trusted player, or None."""
+        return self._extreme(self._min_heap, 1, candidates)
+
+    def as_array(self, player_ids, default=np.nan):
+        """Decayed suspicion of the given players toward each other as an (n, n) float64 array (unset -> default)."""
+        idx = np.fromiter((self.index.get(pid, -1) for pid in player_ids), dtype=np.intp, count=len(player_ids))
+        out = np.full((len(idx), len(idx)), default, dtype=np.float64)
+        known = np.flatnonzero(idx >= 0)
+        if len(known):
+            cells = np.ix_(idx[known], idx[known])
+            block = self._decayed(self.values[cells], self.stamps[cells])
+            out[np.ix_(known, known)] = np.where(np.isnan(block), default, block)
+        return out
+
+    def column_means(self, target_ids, exclude_ids=()):
+        """
+        Average suspicion of each target over every observer except
+        `exclude_ids`, from the column aggregates: only the excluded rows are
+        read, never the whole matrix. Targets nobody has a read on get the
+        baseline.
+        """
+        cols = np.fromiter((self.index.get(t, -1) for t in target_ids), dtype=np.intp, count=len(target_ids))
+        known = np.flatnonzero(cols >= 0)
+        total = np.zeros(len(cols))
+        count = np.zeros(len(cols))
+        total[known] = self.col_sum[cols[known]]
+        count[known] = self.col_count[cols[known]]
+        rows = [self.index[o] for o in exclude_ids if o in self.index]
+        if rows and len(known):
+            cells = np.ix_(rows, cols[known])
+            values = self.values[cells]
+            total[known] -= np.nansum(self._contribution(values, self.stamps[cells]), axis=0)
+            count[known] -= (~np.isnan(values)).sum(axis=0)
+        means = np.full(len(cols), float(self.baseline))
+        rated = count > 0
+        means[rated] = self.baseline + self.decay ** self.epoch * total[rated] / count[rated]
+        return means
+
+
+class DiscussionEventLog:
+    """
+    Indexed store of discussion events (accusations and defenses).
+
+    Keeps the flat (round, actor_id, action_type, target_id) history plus
+    per-actor accusation sets, per-target accuser/defender sets and per-round
+    partitions, so vote analysis can ask "whom did X accuse?" in O(1).
+    """
+    def __init__(self):
+        self.events = []  # [(round, actor_id, action_type, target_id), ...]
+        self.accusations_by = defaultdict(set)  # actor_id -> {target_id}
+        self.accusers_of = defaultdict(set)     # target_id -> {actor_id}
+        self.defenders_of = defaultdict(set)    # target_id -> {actor_id}
+        self.by_round = defaultdict(list)       # round -> [event, ...]
+
+    def __iter__(self):
+        return iter(self.events)
+
+    def __len__(self):
+        return len(self.events)
+
+    def record(self, round_num, actor_id, action_type, target_id):
+        """Record one accuse/defend event and update the indexes."""
+        event = (round_num, actor_id, action_type, target_id)
+        self.events.append(event)
+        self.by_round[round_num].append(event)
+        if action_type == 'accuse':
+            self.accusations_by[actor_id].add(target_id)
+            self.accusers_of[target_id].add(actor_id)
+        elif action_type == 'defend':
+            self.defenders_of[target_id].add(actor_id)
+
+    def append(self, event):
+        """List-style alias for record()."""
+        self.record(*event)
+
+    def accused_by(self, actor_id):
+        """Set of players this actor accused (empty if none)."""
+        return self.accusations_by.get(actor_id, frozenset())
+
+    def clear(self):
+        self.events.clear()
+        self.accusations_by.clear()
+        self.accusers_of.clear()
+        self.defenders_of.clear()
+        self.by_round.clear()
+
+
+class VoteTally:
+    """
+    Incremental per-target vote counts with a live plurality leader.
+
+    Counts only ever move by one, so targets are bucketed by count and the
+    top bucket is tracked directly: cast, change and retract are O(1).
+    """
+    def __init__(self):
+        self.counts = {}  # target_id -> votes
+        self._buckets = defaultdict(set)  # votes -> {target_id}
+        self.max_count = 0
+
+    def add(self, target_id):
+        count = self.counts.get(target_id, 0)
+        if count:
+            self._buckets[count].discard(target_id)
+        self.counts[target_id] = count + 1
+        self._buckets[count + 1].add(target_id)
+        if count + 1 > self.max_count:
+            self.max_count = count + 1
+
+    def remove(self, target_id):
+        count = self.counts.get(target_id, 0)
+        if not count:
+            return
+        self._buckets[count].discard(target_id)
+        if count == 1:
+            del self.counts[target_id]
+        else:
+            self.counts[target_id] = count - 1
+            self._buckets[count - 1].add(target_id)
+        if count == self.max_count and not self._buckets[count]:
+            self.max_count -= 1
+
+    def get(self, target_id, default=0):
+        return self.counts.get(target_id, default)
+
+    @property
+    def is_tied(self):
+        """True if two or more targets share the top count."""
+        return len(self._buckets[self.max_count]) > 1 if self.max_count else False
+
+    @property
+    def leader(self):
+        """Plurality target (may be 'SKIP'), or None if tied or no votes."""
+        if not self.max_count:
+            return None
+        top = self._buckets[self.max_count]
+        return next(iter(top)) if len(top) == 1 else None
+
+
+class VoteLedger:
+    """
+    Ordered record of the current voting phase.
+
+    Each vote carries a sequence number and a time.monotonic() timestamp.
+    Changing a vote moves the voter to the back of the order, since the
+    final vote is the one that counts. Behaves like the old voter -> target
+    dict and keeps a VoteTally in sync on every change. Per-voter ordinal
+    and lateness queries are O(1) amortized: ordinals are recomputed once
+    after a batch of changes.
+    """
+    def __init__(self, votes=None):
+        self._entries = {}  # voter_id -> (seq, timestamp, target_id), in vote order
+        self._seq = 0
+        self._ordinals = None
+        self.version = 0  # Bumped on every cast/change/retract
+        self.tally = VoteTally()  # Live per-target counts and leader
+        for voter_id, target_id in (votes or {}).items():
+            self.cast(voter_id, target_id)
+
+    def cast(self, voter_id, target_id):
+        """Record or change a vote. Returns the previous target (or None)."""
+        previous = self._entries.get(voter_id)
+        if previous and previous[2] == target_id:
+            return target_id  # Re-voting the same target keeps the original timing
+        self._entries.pop(voter_id, None)
+        if previous:
+            self.tally.remove(previous[2])
+        self._seq += 1
+        self._entries[voter_id] = (self._seq, time.monotonic(), target_id)
+        self.tally.add(target_id)
+        self._ordinals = None
+        self.version += 1
+        return previous[2] if previous else None
+
+    def retract(self, voter_id):
+        """Withdraw a vote. Returns the retracted target (or None)."""
+        previous = self._entries.pop(voter_id, None)
+        if previous is None:
+            return None
+        self.tally.remove(previous[2])
+        self._ordinals = None
+        self.version += 1
+        return previous[2]
+
+    def ordinal(self, voter_id):
+        """0-based position of the voter's current vote, or -1 if they haven't voted."""
+        if self._ordinals is None:
+            self._ordinals = {v: i for i, v in enumerate(self._entries)}
+        return self._ordinals.get(voter_id, -1)
+
+    def lateness(self, voter_id):
+        """Fraction of votes cast before this voter's (0.0 = first), or None."""
+        position = self.ordinal(voter_id)
+        return position / len(self._entries) if position >= 0 else None
+
+    def sequence(self, voter_id):
+        entry = self._entries.get(voter_id)
+        return entry[0] if entry else None
+
+    def timestamp(self, voter_id):
+        entry = self._entries.get(voter_id)
+        return entry[1] if entry else None
+
+    # --- dict-style access (voter_id -> target_id) ---
+
+    def __getitem__(self, voter_id):
+        return self._entries[voter_id][2]
+
+    def __setitem__(self, voter_id, target_id):
+        self.cast(voter_id, target_id)
+
+    def __delitem__(self, voter_id):
+        if voter_id not in self._entries:
+            raise KeyError(voter_id)
+        self.retract(voter_id)
+
+    def __contains__(self, voter_id):
+        return voter_id in self._entries
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, voter_id, default=None):
+        entry = self._entries.get(voter_id)
+        return entry[2] if entry else default
+
+    def keys(self):
+        return self._entries.keys()
+
+    def values(self):
+        return [entry[2] for entry in self._entries.values()]
+
+    def items(self):
+        return [(voter_id, entry[2]) for voter_id, entry in self._entries.items()]
+
+
+class LobbyRNG:
+    """
+    Seedable random source owned by one lobby.
+
+    Scalar draws (random, uniform, randrange, choice, shuffle) are served
+    from a buffer of uniforms drawn BLOCK at a time, so hot loops do not pay
+    a generator call per number; vectorized updates take whole arrays
+    (uniform with size, random_block). Every draw derives from `seed`, so
+    reset() replays a game exactly.
+    """
+    BLOCK = 256
+
+    def __init__(self, seed=None):
+        self.seed = random.getrandbits(64) if seed is None else int(seed)  # Unseeded lobbies follow the module RNG
+        self.reset()
+
+    def reset(self, seed=None):
+        """Restart the sequence from `seed` (default: the stored one)."""
+        if seed is not None:
+            self.seed = int(seed)
+        self.generator = np.random.default_rng(self.seed)
+        self._buffer = ()
+        self._next = 0
+
+    def random(self):
+        """A float in [0, 1)."""
+        if self._next >= len(self._buffer):
+            self._buffer = self.generator.random(self.BLOCK).tolist()
+            self._next = 0
+        value = self._buffer[self._next]
+        self._next += 1
+        return value
+
+    def uniform(self, low, high, size=None):
+        """A float in [low, high), or an array of them when size is given."""
+        if size is None:
+            return low + (high - low) * self.random()
+        return self.generator.uniform(low, high, size=size)
+
+    def random_block(self, size):
+        """An array of floats in [0, 1)."""
+        return self.generator.random(size)
+
+    def lognormal(self, median, sigma, size):
+        """An array of log-normal draws with the given median and log-space spread."""
+        return self.generator.lognormal(math.log(median), sigma, size)
+
+    def randrange(self, n):
+        return min(int(self.random() * n), n - 1)
+
+    def choice(self, seq):
+        return seq[self.randrange(len(seq))]
+
+    def shuffle(self, items):
+        """Fisher-Yates shuffle in place."""
+        for i in range(len(items) - 1, 0, -1):
+            j = self.randrange(i + 1)
+            items[i], items[j] = items[j], items[i]
+
 
 class GameLobby:
-    def __init__(self, channel_id, host: discord.User):
+    def __init__(self, channel_id, host: discord.User = None, weights=None, role_setup=None, seed=None):
         self.channel_id = channel_id
-        self.host_id = host.id
+        self.weights = WEIGHTS if weights is None else weights  # Suspicion engine weights (simulations pass variants)
+        self.role_setup = ROLE_SETUP if role_setup is None else role_setup
+        self.host_id = host.id if host else None  # None: headless lobby (simulation)
+        self.scheduler = None  # PhaseScheduler, attached by MafiaBot.add_lobby
+        self.renderer = None   # RenderScheduler, attached by MafiaBot.add_lobby
+        self.view = None       # Persistent GameView, created once by get_view
+        self.narrator = None   # Narrator, attached by MafiaBot.add_lobby (None: plain dawn text)
+        self.timer_marks = {}  # kind -> deadline of this lobby's live scheduler entry
+        self.state_version = 0  # Bumped on every visible state change (see touch)
+        self.timer_display = TIMER_DISPLAY_MODE  # 'relative' (no periodic edits) or 'countdown'
+        self.life_version = 0   # Bumped when anyone dies or the game (re)starts
+        self.stats_version = 0  # Bumped when accountability counters change or reset
+        self._embed_sections = {}  # section -> (key, rendered value), see _memo_section
         self.status = 'waiting' # waiting, in-game, finished
-        self.players = {host.id: Player(host, is_host=True)}
+        self.players = PlayerRoster({host.id: Player(host, is_host=True)} if host else {})
         
         # Game State
         self.phase = 'night'
@@ -195,9 +1386,10 @@ class GameLobby:
         self.winner = None
         
         # Storage
-        self.votes = {}     # voter_id -> target_id (current phase)
+        self.votes = {}     # VoteLedger: voter_id -> target_id (current phase, in vote order)
         self.actions = {}   # actor_id -> target_id (Night)
-        self.suspicion_matrix = SuspicionMatrix()  # Core psychometric engine
+        self.suspicion_matrix = DenseSuspicionMatrix(decay=self.weights['MEMORY_DECAY'])  # Core psychometric engine
+        self.rng = LobbyRNG(seed)  # Every random draw in this lobby; rng.seed replays a game
         
         # Action tracking for phase completion
         self.actions_required = {}  # phase -> list of player_ids who must act
@@ -205,40 +1397,169 @@ class GameLobby:
         self.discussion_actions_completed = set()  # Discussion phase actions
         
         # Behavioral tracking
-        self.discussion_events = []  # [(round, actor_id, action_type, target_id), ...]
+        self.discussion_events = DiscussionEventLog()  # Indexed (round, actor_id, action_type, target_id) events
         self.death_log = []  # [(round, player_id, role), ...]
         self.logs = []      # List of strings for public logs
+        self.events = []    # Outbox of (kind, text) for the Discord layer, see emit/flush_events
         self.rumors = []  # [(target_id, direction), ...] direction: +1 or -1
         
         # Stats tracking
         self.accusation_count = {}  # target_id -> count of accusations
         self.defense_count = {}  # target_id -> count of defenses
-        self.vote_count = {}  # target_id -> count of votes
         
         # Bot testing mode
         self.bot_mode = None  # 'auto' or 'manual' (None = no bots)
+        self.bot_agenda = deque()  # (when, bot_id) auto-bot actions planned for this phase, earliest first
+        self.fast_forward_enabled = False  # Host switch (/mafia_fast_forward); bots-only lobbies fast-forward anyway
+        self.fast_forwarded = False  # Output was held back at some point, so the game ends with a summary
+        self._bots_only = (None, False)  # (roster version, no human in the roster), see bots_only
         self.used_bot_names = set()  # Track which bot names are in use
-        self.player_list = []  # Ordered list of player IDs for index-based lookups
         self.recently_joined = []  # Track recently joined players for UI display
         self.last_message = None  # Track last game message for editing instead of sending new ones
         self.last_panel_phase = None  # Track which phase was used for the last panel message (to resend on phase change)
-        self.lock = asyncio.Lock()  # Prevent concurrent operations on this lobby
         self.last_panel_phase = None  # Track which phase was last shown on the panel
 
-    def get_player_by_index(self, index: int):
-        """Get player by their index in the player list."""
-        if 0 <= index < len(self.player_list):
-            player_id = self.player_list[index]
-            return self.players.get(player_id)
-        return None
-    
+    def attach_scheduler(self, scheduler):
+        self.scheduler = scheduler
+        for kind, when in self.timer_marks.items():
+            scheduler.schedule(self.channel_id, when, kind)
+
+    def schedule_tick(self, kind, when):
+        """Queue (or move) this lobby's single live timer of the given kind."""
+        self.timer_marks[kind] = when
+        if self.scheduler is not None:
+            self.scheduler.schedule(self.channel_id, when, kind)
+
+    def is_live_tick(self, kind, when):
+        """True if a fired scheduler entry is still this lobby's current one of its kind."""
+        return self.timer_marks.get(kind) == when
+
+    @property
+    def bots_only(self):
+        """True if no human is in the game at all (dead humans still count, so spectating players keep their feed)."""
+        version, value = self._bots_only
+        if version != self.players.version:
+            value = bool(self.players) and all(p.is_bot for p in self.players.values())
+            self._bots_only = (self.players.version, value)
+        return value
+
+    @property
+    def fast_forward(self):
+        """Bot-paced game: phases resolve once the bots have acted and panels aren't re-rendered until the end."""
+        return self.fast_forward_enabled or self.bots_only
+
+    def set_fast_forward(self, enabled):
+        """Host switch: replan the current phase's bot actions for the new pace and advance if they're all in."""
+        self.fast_forward_enabled = enabled
+        if self.status != 'in-game':
+            return
+        if self.bot_mode == 'auto' or (self.fast_forward and self.bot_mode):
+            self.schedule_bot_actions()
+        else:
+            self.bot_agenda = deque()
+        if not self.fast_forward:
+            self.touch()  # Bring the panel back up to date
+        self.request_check()
+
+    def touch(self):
+        """Mark visible state as changed and queue a coalesced panel edit."""
+        self.state_version += 1
+        if self.status == 'in-game' and not self.fast_forward and self.timer_marks.get('render', 0) <= time.time():
+            self.schedule_tick('render', time.time() + RENDER_COALESCE_WINDOW)
+
+    def mark_dead(self, player):
+        """Kill a player (version-tracked so the rendered roster is rebuilt)."""
+        player.is_alive = False
+        self.life_version += 1
+
+    def record_discussion_action(self, actor_id, action_type, target_id):
+        """Record an accusation/defense: event index, participation and accountability stats."""
+        self.discussion_events.record(self.round, actor_id, action_type, target_id)
+        self.discussion_actions_completed.add(actor_id)
+        if action_type == 'accuse':
+            self.accusation_count[target_id] = self.accusation_count.get(target_id, 0) + 1
+        elif action_type == 'defend':
+            self.defense_count[target_id] = self.defense_count.get(target_id, 0) + 1
+        self.stats_version += 1
+
+    def request_check(self):
+        """Completion event: once the last required action is in, have the game loop advance right away."""
+        if self._check_phase_completion():
+            self.schedule_tick('check', time.time())
+
+    def set_phase_deadline(self, duration):
+        """Start the current phase's clock: schedule its deadline tick and arm the phase's own ticks."""
+        self.phase_start_time = time.time()
+        self.phase_end_time = self.phase_start_time + duration
+        self.schedule_tick('phase', self.phase_end_time)  # The game loop no longer polls for deadlines
+        self._arm_ticks()
+
+    def _arm_ticks(self):
+        """On each new phase: start the panel refresh (countdown mode) and plan the auto bots' actions."""
+        now = time.time()
+        fast_forward = self.fast_forward
+        if self.timer_display == 'countdown' and not fast_forward and self.timer_marks.get('refresh', 0) < now:
+            self.schedule_tick('refresh', now + 3)
+        if self.bot_mode == 'auto' or (fast_forward and self.bot_mode):
+            self.schedule_bot_actions(now)
+
+    def schedule_bot_actions(self, now=None):
+        """
+        Give every living bot that acts this phase one reaction time and arm
+        the 'bots' tick for the earliest. Bots then cost nothing until their
+        turn comes (see run_due_bot_actions).
+        """
+        now = time.time() if now is None else now
+        self.bot_agenda = deque()
+        if self.phase not in BOT_ACTION_DELAY:
+            return
+        bots = [p.id for p in self.players.values()
+                if p.is_bot and p.is_alive and not (self.phase == 'night' and p.role == 'villager')]
+        if not bots:
+            return
+        if self.fast_forward:
+            delays = np.zeros(len(bots))  # Fast-forward: act at once
+        else:
+            median, spread = BOT_ACTION_DELAY[self.phase]
+            latest = max(BOT_ACTION_MIN_DELAY, BOT_ACTION_DEADLINE_SHARE * PHASE_DURATION[self.phase])
+            delays = np.clip(self.rng.lognormal(median, spread, len(bots)), BOT_ACTION_MIN_DELAY, latest)
+        self.bot_agenda = deque(sorted(zip((now + delays).tolist(), bots)))
+        self.schedule_tick('bots', self.bot_agenda[0][0])
+
+    def run_due_bot_actions(self, now=None):
+        """Let the bots whose reaction time has come act, then re-arm the 'bots' tick for the next one."""
+        now = time.time() if now is None else now
+        due = []
+        while self.bot_agenda and self.bot_agenda[0][0] <= now:
+            due.append(self.bot_agenda.popleft()[1])
+        if due:
+            self.run_bot_actions(due)
+        if self.bot_agenda:
+            self.schedule_tick('bots', self.bot_agenda[0][0])
+
+    @property
+    def votes(self):
+        """Current phase's VoteLedger (voter_id -> target_id)."""
+        return self._votes
+
+    @votes.setter
+    def votes(self, value):
+        self._votes = value if isinstance(value, VoteLedger) else VoteLedger(value)
+        self.stats_version = getattr(self, 'stats_version', 0) + 1
+
+    @property
+    def vote_count(self):
+        """target_id -> current votes, straight from the live tally (follows vote changes)."""
+        return self.votes.tally.counts
+
     def get_player_index(self, player_id):
         """Get a dynamic index for any player based on current players dict."""
-        # Create a sorted list of current player IDs to ensure consistent indexing
-        current_players = sorted(self.players.keys())
-        if player_id in current_players:
-            return current_players.index(player_id)
-        return -1
+        # Sorted player IDs give consistent indexing; the roster caches the map until the player set changes
+        return self.players.index_of(player_id)
+
+    def get_player_id_by_index(self, index: int):
+        """Decode a dynamic index from a select menu back to a player ID (None if stale)."""
+        return self.players.id_at(index)
 
     async def add_player(self, user: discord.User):
         if user.id not in self.players:
@@ -266,11 +1587,13 @@ class GameLobby:
             bot_name = available_names[0]
             self.used_bot_names.add(bot_name)
             
-            bot_id = random.randint(1000000000, 9999999999)
+            bot_id = 1000000000 + self.rng.randrange(9000000000)
             while bot_id in self.players:
-                bot_id = random.randint(1000000000, 9999999999)
+                bot_id = 1000000000 + self.rng.randrange(9000000000)
             
-            self.players[bot_id] = Player(is_bot=True, bot_name=bot_name)
+            bot_player = Player(is_bot=True, bot_name=bot_name)
+            bot_player.id = bot_id  # Keyed by the same id everywhere (actions, votes, required lists)
+            self.players[bot_id] = bot_player
             # Track recently joined bots
             self.recently_joined.append(f"🤖 {bot_name}")
             if len(self.recently_joined) > 3:
@@ -284,40 +1607,111 @@ class GameLobby:
         return False, "Could not add bots."
     
     def get_bot_action(self, bot_id: int, alive_players: list):
-        """Generate automatic action for a bot."""
+        """Automatic action for one bot (see plan_bot_actions for the policy and format)."""
         if not alive_players:
             return None
-        
-        if bot_id not in self.players:
-            return None  # Bot no longer exists
-        
-        bot = self.players[bot_id]
-        
+        return self.plan_bot_actions([bot_id]).get(bot_id)
+
+    def _pick_top_k(self, scores, k):
+        """Column of a random one of each row's k highest scores (NaN = not eligible); -1 where a row has none."""
+        filled = np.where(np.isnan(scores), -np.inf, scores)
+        k = max(1, min(k, filled.shape[1]))
+        order = np.argsort(-filled, axis=1, kind='stable')[:, :k]
+        eligible = np.minimum(np.isfinite(filled).sum(axis=1), k)
+        choice = (self.rng.random_block(len(filled)) * np.maximum(eligible, 1)).astype(np.intp)
+        return np.where(eligible > 0, order[np.arange(len(filled)), choice], -1)
+
+    def plan_bot_actions(self, bot_ids):
+        """
+        Decide the current phase's action for every bot in `bot_ids` in one
+        vectorized pass over the suspicion matrix.
+
+        Each bot reads its own row and picks one of its TOP_K strongest
+        suspects (when voting, the single strongest after blending in the
+        town's average read). Mafia never target teammates. The doctor
+        protects the player they trust most. The detective skips players
+        they already have a certain read on. Returns {bot_id: action}: a target id at
+        night, ('accuse' | 'defend', target_id) or ('skip', None) in
+        discussion, and a target id or 'SKIP' when voting. Bots with
+        nothing to do (villagers at night, dead bots) are left out.
+        """
+        alive = [pid for pid, p in self.players.items() if p.is_alive]
+        position = {pid: i for i, pid in enumerate(alive)}
+        bots = [b for b in bot_ids if b in position]
         if self.phase == 'night':
-            # Night action: pick random target
-            if bot.role == 'villager':
-                return None  # Villagers don't act
-            targets = [p for p in alive_players if p.id != bot_id]
-            return random.choice(targets).id if targets else None
-        
+            bots = [b for b in bots if self.players[b].role != 'villager']
+        if not bots or len(alive) < 2 or self.phase not in ('night', 'discussion', 'voting'):
+            return {}
+
+        rows = np.array([position[b] for b in bots], dtype=np.intp)
+        n = len(rows)
+        is_mafia = np.array([self.players[pid].role == 'mafia' for pid in alive])
+        matrix = self.suspicion_matrix.as_array(alive, default=BASELINE_SUSPICION)
+        np.fill_diagonal(matrix, np.nan)  # Never target yourself
+        sus = matrix[rows]
+        if self.phase == 'voting':
+            # Votes follow the room as well as the bot's own read, so the town doesn't split its votes
+            share = BOT_POLICY['CONSENSUS']
+            sus = (1 - share) * sus + share * self.public_suspicion(alive)
+        suspects = sus.copy()
+        suspects[np.ix_(is_mafia[rows], is_mafia)] = np.nan  # Mafia know their teammates
+        top = self._pick_top_k(suspects, 1 if self.phase == 'voting' else BOT_POLICY['TOP_K'])
+        top_value = np.where(top >= 0, suspects[np.arange(n), np.maximum(top, 0)], np.nan)
+        trusted_scores = np.where(np.isnan(sus), np.inf, sus)
+        mafia_rows = np.flatnonzero(is_mafia[rows])
+        if self.phase == 'discussion' and len(mafia_rows):
+            # Mafia defend from the room's read like anyone else; their own rows would single out teammates
+            trusted_scores[mafia_rows] = self.public_suspicion(alive)
+            trusted_scores[mafia_rows, rows[mafia_rows]] = np.inf
+        trusted = np.where(np.isfinite(trusted_scores).any(axis=1), trusted_scores.argmin(axis=1), -1)
+        trusted_value = trusted_scores[np.arange(n), np.maximum(trusted, 0)]
+
+        plan = {}
+        if self.phase == 'night':
+            roles = [self.players[b].role for b in bots]
+            unread = None
+            if 'detective' in roles:
+                # Readings already pinned at certainty (see propagate_intuition) are not worth a night
+                pending = np.where((suspects <= EPSILON) | (suspects >= 100 - EPSILON), np.nan, suspects)
+                unread = self._pick_top_k(pending, BOT_POLICY['TOP_K'])
+            for r, (bot_id, role) in enumerate(zip(bots, roles)):
+                if role == 'doctor':
+                    column = trusted[r]
+                elif role == 'detective':
+                    column = unread[r] if unread[r] >= 0 else top[r]
+                else:
+                    column = top[r]
+                if column >= 0:
+                    plan[bot_id] = alive[column]
         elif self.phase == 'discussion':
-            # Discussion: accuse, defend, or skip randomly
-            return random.choice(['accuse', 'defend', 'skip'])
-        
-        elif self.phase == 'voting':
-            # Voting: vote for someone or skip
-            targets = [p.id for p in alive_players if p.id != bot_id]
-            return random.choice(targets + ['SKIP']) if targets else 'SKIP'
-        
-        return None
+            accuse = top_value >= BOT_POLICY['ACCUSE_AT']
+            defend = ~accuse & (trusted >= 0) & (trusted_value <= BOT_POLICY['DEFEND_AT'])
+            for r, bot_id in enumerate(bots):
+                if accuse[r]:
+                    plan[bot_id] = ('accuse', alive[top[r]])
+                elif defend[r]:
+                    plan[bot_id] = ('defend', alive[trusted[r]])
+                else:
+                    plan[bot_id] = ('skip', None)
+        else:
+            # Mafia always push an elimination; town needs a pick that stands out
+            vote = (top >= 0) & (is_mafia[rows] | (top_value >= BOT_POLICY['VOTE_AT']))
+            for r, bot_id in enumerate(bots):
+                plan[bot_id] = alive[top[r]] if vote[r] else 'SKIP'
+        return plan
     
     async def process_auto_bot_actions(self, bot_instance):
-        """Process automatic actions for bots in auto mode."""
-        alive_players = [p for p in self.players.values() if p.is_alive]
-        
+        """Process the automatic actions that are due for bots in auto mode."""
+        self.run_due_bot_actions()
+
+    def run_bot_actions(self, bot_ids=None):
+        """Let every living bot (or just `bot_ids`) that hasn't acted yet take its action for the current phase."""
+        pending = []
         for player in self.players.values():
             if not player.is_bot or not player.is_alive:
                 continue
+            if bot_ids is not None and player.id not in bot_ids:
+                continue
             
             # Skip if bot already acted in this phase
             if self.phase == 'night' and player.id in self.actions_completed:
@@ -326,9 +1720,12 @@ class GameLobby:
                 continue
             elif self.phase == 'voting' and player.id in self.votes:
                 continue
-            
-            # Get bot action
-            action = self.get_bot_action(player.id, alive_players)
+            pending.append(player)
+
+        # One policy pass for every pending bot
+        plan = self.plan_bot_actions([player.id for player in pending])
+        for player in pending:
+            action = plan.get(player.id)
             if action is None:
                 continue
             
@@ -339,9 +1736,14 @@ class GameLobby:
                 self.logs.append(f"🤖 **{player.name}** ({player.role.title()}) performed night action.")
             
             elif self.phase == 'discussion':
-                self.discussion_actions_completed.add(player.id)
-                action_text = "accused" if action == 'accuse' else "defended" if action == 'defend' else "skipped"
-                self.logs.append(f"🤖 **{player.name}** {action_text} in discussion.")
+                action_type, target_id = action
+                if action_type == 'skip':
+                    self.discussion_actions_completed.add(player.id)
+                    self.logs.append(f"🤖 **{player.name}** skipped in discussion.")
+                else:
+                    self.record_discussion_action(player.id, action_type, target_id)
+                    action_text = "accused" if action_type == 'accuse' else "defended"
+                    self.logs.append(f"🤖 **{player.name}** {action_text} **{self.players[target_id].name}**.")
             
             elif self.phase == 'voting':
                 self.votes[player.id] = action
@@ -351,6 +1753,8 @@ class GameLobby:
                     target_name = self.players.get(action, None)
                     if target_name:
                         self.logs.append(f"🤖 **{player.name}** voted for **{target_name.name}**.")
+            self.touch()
+        self.request_check()
 
     def start_game(self):
         if len(self.players) < 3:
@@ -365,46 +1769,41 @@ class GameLobby:
         
         self.status = 'in-game'
         player_ids = list(self.players.keys())
-        self.player_list = player_ids  # Store ordered list for index-based lookups
         count = len(player_ids)
         
         # Assign Roles
-        mafia_num = max(1, count // 3)
+        setup = self.role_setup
+        mafia_num = max(1, count // setup['mafia_divisor'])
         roles = ['mafia'] * mafia_num
-        if count >= 4: roles.append('doctor')
-        if count >= 5: roles.append('detective')
+        if count >= setup['doctor_min_players']: roles.append('doctor')
+        if count >= setup['detective_min_players']: roles.append('detective')
         while len(roles) < count:
             roles.append('villager')
         
-        random.shuffle(roles)
+        self.rng.shuffle(roles)
         
         for i, pid in enumerate(player_ids):
             self.players[pid].role = roles[i]
             self.players[pid].is_alive = True
+        self.life_version += 1
 
         self.mafia_count = mafia_num
         self.villager_count = count - mafia_num
         
         # Initialize Suspicion Matrix (High Entropy Model)
-        for obs_id in player_ids:
-            for target_id in player_ids:
-                if obs_id == target_id: 
-                    continue
-                # Mafia know each other (0 suspicion), everyone else starts ~35 ± noise
-                if (self.players[obs_id].role == 'mafia' and 
-                    self.players[target_id].role == 'mafia'):
-                    self.suspicion_matrix.set(obs_id, target_id, EPSILON)
-                else:
-                    noise = random.uniform(-10, 10)
-                    self.suspicion_matrix.set(obs_id, target_id, BASELINE_SUSPICION + noise)
+        # Mafia know each other (0 suspicion), everyone else starts ~35 ± noise.
+        # Noise is drawn as one block from the lobby's NumPy generator.
+        mafia_mask = [self.players[pid].role == 'mafia' for pid in player_ids]
+        noise = self.rng.uniform(-10, 10, size=(count, count))
+        self.suspicion_matrix.initialize(player_ids, mafia_mask, noise)
 
         self.phase = 'night'
         self.round = 1
-        self.phase_start_time = time.time()
-        self.phase_end_time = time.time() + PHASE_DURATION['night']
+        self.set_phase_deadline(PHASE_DURATION['night'])
         
         # Set up actions required for night phase
         self._setup_night_actions()
+        self.prefetch_dawn_intro()
         
         self.logs.append("🌙 Night 1 has begun. Roles, perform your actions...")
         return True, "Game Started"
@@ -500,18 +1899,11 @@ class GameLobby:
         """Wait countdown seconds and auto-start the game if conditions are met."""
         try:
             await asyncio.sleep(countdown)
-            # If lobby still waiting and enough players, start the game
-            if self.status == 'waiting' and len(self.players) >= 5:
-                async with self.lock:
-                    if self.status != 'waiting':
-                        return
-                    success, msg = self.start_game()
-                    if success:
-                        channel = bot_instance.get_channel(self.channel_id) if bot_instance else None
-                        # Store role_reveals and send initial game panel (use update_view to create the panel)
-                        if channel:
-                            await self.send_role_reveals(channel)
-                            await self.update_view(channel, msg)
+            # If lobby still waiting and enough players, have the lobby actor start the game
+            if self.status == 'waiting' and len(self.players) >= 5 and bot_instance:
+                channel = bot_instance.get_channel(self.channel_id)
+                if channel:
+                    bot_instance.post(self.channel_id, StartGame(channel, None))
         except asyncio.CancelledError:
             return
         except Exception:
@@ -551,14 +1943,22 @@ class GameLobby:
     
     def _check_phase_completion(self):
         """Check if all required actions are completed for current phase."""
+        if self.status != 'in-game':
+            return False
         required = self.actions_required.get(self.phase, [])
+        if self.fast_forward_enabled and self.phase != 'night':
+            # Host-enabled fast-forward doesn't wait for humans to talk or vote. Night roles still
+            # count: a human who misses the night is eliminated, so they get the full timer.
+            required = [pid for pid in required if pid in self.players and self.players[pid].is_bot]
+        if not required:
+            return False  # Nothing to wait for: let the timer run
         
         if self.phase == 'night':
-            return len(self.actions_completed) >= len(required)
+            return all(pid in self.actions_completed for pid in required)
         elif self.phase == 'discussion':
-            return len(self.discussion_actions_completed) >= len(required)
+            return all(pid in self.discussion_actions_completed for pid in required)
         elif self.phase == 'voting':
-            return len(self.votes) >= len(required)
+            return all(pid in self.votes for pid in required)
         
         return False
     
@@ -575,15 +1975,34 @@ class GameLobby:
         
         return 0, 0
     
-    def should_auto_advance_discussion(self):
-        """Check if discussion phase should auto-advance (all players acted)."""
-        if self.phase != 'discussion':
-            return False
-        required_players = self.actions_required.get('discussion', [])
-        return required_players and set(required_players).issubset(self.discussion_actions_completed)
-    
     # --- SUSPICION ENGINE: Mathematical Core ---
     
+    def most_suspected_player(self):
+        """Alive player the town suspects most on average, as (player_id, suspicion) or None."""
+        alive = {pid for pid, p in self.players.items() if p.is_alive}
+        return self.suspicion_matrix.most_suspected(alive)
+
+    def public_suspicion(self, player_ids):
+        """
+        The room's read on each player: average suspicion over every living
+        observer, from the matrix's column aggregates. Hidden roles play no
+        part, so bots acting on it learn nothing about who is mafia.
+        """
+        dead = [pid for pid, p in self.players.items() if not p.is_alive]
+        return self.suspicion_matrix.column_means(player_ids, exclude_ids=dead)
+
+    def suspicion_accuracy(self):
+        """Share of living town players whose own top suspect is actually mafia (None if there are none)."""
+        alive = [pid for pid, p in self.players.items() if p.is_alive]
+        town_rows = [i for i, pid in enumerate(alive) if self.players[pid].role != 'mafia']
+        if not town_rows or len(alive) < 2:
+            return None
+        sus = self.suspicion_matrix.as_array(alive, default=-np.inf)
+        np.fill_diagonal(sus, -np.inf)
+        top = np.argmax(sus[town_rows], axis=1)
+        is_mafia = np.array([self.players[pid].role == 'mafia' for pid in alive])
+        return float(is_mafia[top].mean())
+
     def clamp_suspicion(self, value):
         """Clamp suspicion to valid range."""
         return max(EPSILON, min(100 - EPSILON, value))
@@ -605,20 +2024,20 @@ class GameLobby:
         current = self.suspicion_matrix.get(observer_id, target_id)
         
         # 1. Noise Multiplier: No two observers interpret the same way
-        noise_multiplier = random.uniform(
-            WEIGHTS['NOISE_MULTIPLIER_MIN'],
-            WEIGHTS['NOISE_MULTIPLIER_MAX']
+        noise_multiplier = self.rng.uniform(
+            self.weights['NOISE_MULTIPLIER_MIN'],
+            self.weights['NOISE_MULTIPLIER_MAX']
         )
         
         # 2. Misinterpretation Chance: Flip polarity occasionally
-        if random.random() < WEIGHTS['MISINTERPRETATION_CHANCE']:
+        if self.rng.random() < self.weights['MISINTERPRETATION_CHANCE']:
             base_weight = -base_weight
         
         # 3. Confirmation Bias: If I already suspect you, bad looks worse
         if current > 60:  # High suspicion
-            base_weight *= WEIGHTS['CONFIRMATION_BIAS_HIGH']
+            base_weight *= self.weights['CONFIRMATION_BIAS_HIGH']
         elif current < 40:  # High trust
-            base_weight *= WEIGHTS['CONFIRMATION_BIAS_LOW']
+            base_weight *= self.weights['CONFIRMATION_BIAS_LOW']
         
         # 4. Apply weight and noise
         impact = base_weight * noise_multiplier
@@ -628,19 +2047,50 @@ class GameLobby:
         new_value = self.clamp_suspicion(new_value)
         self.suspicion_matrix.set(observer_id, target_id, new_value)
     
+    def update_beliefs(self, observers, target_id, base_weight):
+        """
+        Batched belief update: one action seen by many observers.
+
+        Same model as update_belief (noise, misinterpretation, confirmation
+        bias, clamping), applied to the target's whole column in one
+        vectorized pass. Observers equal to the target or no longer in the
+        game are ignored.
+        """
+        if target_id not in self.players:
+            return
+        observer_ids = [o for o in observers if o != target_id and o in self.players]
+        if not observer_ids:
+            return
+        count = len(observer_ids)
+        current = self.suspicion_matrix.get_column(observer_ids, target_id)
+
+        # 1. Noise Multiplier per observer
+        noise_multiplier = self.rng.uniform(
+            self.weights['NOISE_MULTIPLIER_MIN'],
+            self.weights['NOISE_MULTIPLIER_MAX'],
+            size=count
+        )
+
+        # 2. Misinterpretation: flip polarity for a random subset
+        weights = np.full(count, float(base_weight))
+        weights[self.rng.random_block(count) < self.weights['MISINTERPRETATION_CHANCE']] *= -1
+
+        # 3. Confirmation Bias
+        weights[current > 60] *= self.weights['CONFIRMATION_BIAS_HIGH']
+        weights[current < 40] *= self.weights['CONFIRMATION_BIAS_LOW']
+
+        # 4-5. Apply, clamp (in set_column) and store
+        self.suspicion_matrix.set_column(observer_ids, target_id, current + weights * noise_multiplier)
+
     def apply_memory_decay(self):
         """
         Every round, suspicion drifts back toward baseline.
         NewValue = (OldValue * 0.85) + (35 * 0.15)
+
+        Decay is lazy: this only advances the matrix's decay epoch, and each
+        cell applies the elapsed rounds in closed form when it is next read.
         """
-        for obs_id in self.players:
-            for target_id in self.players:
-                if obs_id == target_id:
-                    continue
-                current = self.suspicion_matrix.get(obs_id, target_id)
-                decayed = (current * WEIGHTS['MEMORY_DECAY'] + 
-                          BASELINE_SUSPICION * (1 - WEIGHTS['MEMORY_DECAY']))
-                self.suspicion_matrix.set(obs_id, target_id, decayed)
+        self.suspicion_matrix.advance_epoch()
     
     def propagate_intuition(self, detective_id, target_id, is_mafia):
         """
@@ -652,7 +2102,7 @@ class GameLobby:
         self.suspicion_matrix.set(detective_id, target_id, certainty)
         
         # Leak to others: move slightly toward detective's assessment
-        leak_amount = 5 * WEIGHTS['INTUITION_LEAK']
+        leak_amount = 5 * self.weights['INTUITION_LEAK']
         for obs_id in self.players:
             if obs_id == detective_id:
                 continue
@@ -670,15 +2120,15 @@ class GameLobby:
         Occasionally generate a rumor that affects all players' views of someone.
         Creates organic conversation starters.
         """
-        if random.random() > 0.3:  # 30% chance per round
+        if self.rng.random() > 0.3:  # 30% chance per round
             return
         
         alive_players = [p for p in self.players.values() if p.is_alive]
         if not alive_players:
             return
         
-        target = random.choice(alive_players)
-        direction = random.choice([1, -1])  # +1 (sus) or -1 (trust)
+        target = self.rng.choice(alive_players)
+        direction = self.rng.choice([1, -1])  # +1 (sus) or -1 (trust)
         
         for obs_id in self.players:
             if obs_id == target.id:
@@ -702,103 +2152,267 @@ class GameLobby:
     async def advance_phase(self, bot_instance):
         channel = bot_instance.get_channel(self.channel_id)
         if not channel: return
+        self.advance_phase_rules()
+        await self.flush_events(channel)
+    
+    async def host_end_phase(self, channel):
+        """Host can manually end current phase early."""
+        self.advance_phase_rules(voting_message="🗳️ **Voting Phase (30 sec)** - Host ended discussion early!")
+        await self.flush_events(channel)
+
+    # --- GAME RULES (synchronous; results are queued in self.events for the Discord layer) ---
+
+    def emit(self, kind, text=None):
+        """Queue an event for the Discord layer: ('announce', text) is a channel message, ('panel', text) a panel update."""
+        self.events.append((kind, text))
+
+    async def flush_events(self, channel):
+        """Render queued events in order: announcements are sent, panel events go through update_view."""
+        events, self.events = self.events, []
+        if self.fast_forward and self.status == 'in-game':
+            self.fast_forwarded = True  # Panels are held back; the game ends with one summary instead
+            if self.bots_only:
+                return  # Nobody to tell
+            events = [(kind, text) for kind, text in events if kind != 'panel']  # Humans still get announcements
+        if self.fast_forwarded and self.status == 'finished':
+            headline = next((text for kind, text in reversed(events) if kind == 'panel'), None)
+            events = [('announce', self.fast_forward_summary()), ('panel', headline)]
+            self.fast_forwarded = False
+        for kind, text in events:
+            if kind == 'panel':
+                await self.update_view(channel, text)
+            else:
+                try:
+                    await channel.send(text)
+                except:
+                    pass
 
+    def fast_forward_summary(self):
+        """The one message a fast-forwarded game posts: every death in order, then the result and survivors."""
+        lines = [f"⏩ **Fast-forwarded game** - {self.round} round(s)"]
+        for round_no, pid, role in self.death_log:
+            player = self.players.get(pid)
+            name = player.name if player else pid
+            lines.append(f"• Round {round_no}: **{name}** ({role.title()})")
+        winner = "🏆 **TOWN WINS!**" if self.winner == 'villager' else "💀 **MAFIA WINS!**"
+        survivors = [f"**{p.name}**" for p in self.players.values() if p.is_alive]
+        lines.append(f"{winner} Final Survivors: {', '.join(survivors)}")
+        return "\n".join(lines)
+
+    def advance_phase_rules(self, voting_message="🗳️ **Voting Phase (30 sec)** - Cast your votes!"):
+        """End the current phase: resolve night/voting, or open voting after discussion."""
         if self.phase == 'night':
             # Resolve night and move to discussion
-            await self.resolve_night(channel)
-            return  # resolve_night calls update_view, don't send duplicate
+            self.resolve_night_rules()
 
         elif self.phase == 'discussion':
             # Discussion phase is ending - move to voting (either by timer or early completion)
             self.phase = 'voting'
-            self.phase_start_time = time.time()
-            self.phase_end_time = time.time() + PHASE_DURATION['voting']
+            self.set_phase_deadline(PHASE_DURATION['voting'])
             self._setup_voting()
-            await self.update_view(channel, "🗳️ **Voting Phase (30 sec)** - Cast your votes!")
-            return
+            self.emit('panel', voting_message)
 
         elif self.phase == 'voting':
             # Resolve voting and move to night
-            await self.resolve_voting(channel)
-            return  # resolve_voting calls update_view, don't send duplicate
+            self.resolve_voting_rules()
         
-        # Check Win Condition
+        elif not self._check_game_over() and self.status == 'in-game':
+            self.emit('panel')
+
+    def _check_game_over(self, announce_survivors=True):
+        """Finish the game if a faction has won (Check Win Condition). Returns True if it did."""
         if self.mafia_count == 0:
             self.winner = 'villager'
-            self.status = 'finished'
-            await self.update_view(channel, "🏆 **TOWN WINS!** All Mafia eliminated.")
+            headline = "🏆 **TOWN WINS!** All Mafia eliminated."
+            prefix = "🏆 **TOWN WINS!**"
+        elif self.mafia_count >= self.villager_count:
+            self.winner = 'mafia'
+            headline = "💀 **MAFIA WINS!** They have taken over the town."
+            prefix = "💀 **MAFIA WINS!**"
+        else:
+            return False
+        self.status = 'finished'
+        self.emit('panel', headline)
+        if announce_survivors:
+            # Public final message with survivors and any kicked players
+            survivors = [getattr(p.user, 'mention', f"**{p.name}**") for p in self.players.values() if p.is_alive]
+            kicked = getattr(self, 'recent_kicked', [])
+            extra = f"\n⚠️ Eliminated for failing to act: {', '.join(kicked)}" if kicked else ""
+            self.emit('announce', f"{prefix} Final Survivors: {', '.join(survivors)}{extra}")
+        return True
+
+    # --- PLAYER COMMANDS (applied serially by the lobby actor, see MafiaBot.post) ---
+
+    async def handle_command(self, command, bot_instance):
+        """Apply one inbox command; rejections and extra results go back to the player as a private follow-up."""
+        reply = None
+        if isinstance(command, Join):
+            if self.status != 'waiting':
+                return await self._reply(command, "Game already started!")
+            if not await self.add_player(command.user):
+                return await self._reply(command, "You are already in the lobby.")
+            await self._reply(command, f"✅ **{command.user.name}** joined! ({len(self.players)} players now)", ephemeral=False)
+            # Update the lobby panel to reflect new players
             try:
-                survivors = [getattr(p.user, 'mention', f"**{p.name}**") for p in self.players.values() if p.is_alive]
-                kicked = getattr(self, 'recent_kicked', [])
-                extra = f"\n⚠️ Eliminated for failing to act: {', '.join(kicked)}" if kicked else ""
-                await channel.send(f"🏆 **TOWN WINS!** Final Survivors: {', '.join(survivors)}{extra}")
+                await self.update_lobby_panel(command.channel)
+                # If now 5 or more players, ensure auto-start is scheduled
+                if len(self.players) >= 5:
+                    self.start_auto_start(bot_instance, countdown=30)
             except:
                 pass
-        elif self.mafia_count  >= self.villager_count:
-            self.winner = 'mafia'
-            self.status = 'finished'
-            await self.update_view(channel, "💀 **MAFIA WINS!** They have taken over the town.")
+            return
+        elif isinstance(command, AddBots):
+            success, message = self.add_bots(command.count, command.mode)
+            return await self._reply(command, f"{'✅' if success else '❌'} {message}")
+        elif isinstance(command, SetFastForward):
+            self.set_fast_forward(command.enabled)
+            return
+        elif isinstance(command, CastVote):
+            _, reply = self.cast_vote(command.voter_id, command.target_id)
+        elif isinstance(command, NightAction):
+            _, reply = self.submit_night_action(command.actor_id, command.target_id)
+        elif isinstance(command, DiscussionAction):
+            _, reply = self.submit_discussion_action(command.actor_id, command.action_type, command.target_id)
+        elif isinstance(command, EndPhase):
+            # Only end the phase the host was looking at; a double click or a timer that won the race is a no-op
+            if self.status == 'in-game' and (self.round, self.phase) == (command.round, command.phase):
+                await self.host_end_phase(command.channel)
+        elif isinstance(command, StartGame):
+            if self.status != 'waiting':
+                return
+            if command.requested_by is None and len(self.players) < 5:
+                return  # Auto-start only fires for full lobbies
+            success, msg = self.start_game()
+            if success:
+                print(f"[DEBUG] Starting game in channel {self.channel_id} (requested by {command.requested_by}, seed {self.rng.seed})")
+                # Store role_reveals and send initial game panel (use update_view to create the panel)
+                await self.send_role_reveals(command.channel)
+                await self.update_view(command.channel, msg)
+            else:
+                reply = f"❌ {msg}"
+
+        if reply and command.interaction is not None:
             try:
-                survivors = [getattr(p.user, 'mention', f"**{p.name}**") for p in self.players.values() if p.is_alive]
-                kicked = getattr(self, 'recent_kicked', [])
-                extra = f"\n⚠️ Eliminated for failing to act: {', '.join(kicked)}" if kicked else ""
-                await channel.send(f"💀 **MAFIA WINS!** Final Survivors: {', '.join(survivors)}{extra}")
-            except:
+                await command.interaction.followup.send(reply, ephemeral=True)
+            except discord.HTTPException:
                 pass
-        elif self.status == 'in-game':
-             await self.update_view(channel)
-    
-    async def host_end_phase(self, channel):
-        """Host can manually end current phase early."""
-        if self.phase == 'night':
-            await self.resolve_night(channel)
 
-        elif self.phase == 'discussion':
-            self.phase = 'voting'
-            self.phase_start_time = time.time()
-            self.phase_end_time = time.time() + PHASE_DURATION['voting']
-            self._setup_voting()
-            await self.update_view(channel, "🗳️ **Voting Phase (30 sec)** - Host ended discussion early!")
+    async def _reply(self, command, text, ephemeral=True):
+        """Answer a host/lobby command: a follow-up on its interaction, or a message in its channel (prefix commands)."""
+        try:
+            if command.interaction is not None:
+                await command.interaction.followup.send(text, ephemeral=ephemeral)
+            elif command.channel is not None:
+                await command.channel.send(text)
+        except discord.HTTPException:
+            pass
 
-        elif self.phase == 'voting':
-            await self.resolve_voting(channel)
+    def cast_vote(self, voter_id, target_id):
+        """Record a vote for a player id (or 'SKIP'). Returns (ok, reply)."""
+        if self.status != 'in-game' or self.phase != 'voting':
+            return False, "❌ Voting has already closed."
+        voter = self.players.get(voter_id)
+        if not voter or not voter.is_alive:
+            return False, "You are dead or not playing."
+        if target_id != 'SKIP' and target_id not in self.players:
+            return False, "❌ Target no longer in game."
+        # The ledger's tally tracks vote stats, including changed votes
+        self.votes[voter_id] = target_id
+        self.touch()
+        # Last vote in: resolve immediately instead of waiting for the timer
+        self.request_check()
+        return True, None
+
+    def submit_night_action(self, actor_id, target_id):
+        """Record a night action. Returns (ok, reply); a detective's reply is their investigation result."""
+        if self.status != 'in-game' or self.phase != 'night':
+            return False, "❌ The night is already over."
+        player = self.players.get(actor_id)
+        if not player or not player.is_alive:
+            return False, "You are dead or not in the game."
+        if target_id not in self.players:
+            return False, "❌ Target no longer in game."
+        
+        self.actions[actor_id] = target_id
+        self.actions_completed.add(actor_id)
+        self.touch()
+        target_player = self.players[target_id]
+        
+        reply = None
+        # Immediate Detective Feedback (suspicion-based, not hard role confirmation)
+        if player.role == 'detective':
+            # Detective investigates: adjust suspicion based on role with margin of error
+            target_role = target_player.role
+            if target_role == 'mafia':
+                # Lower suspicion (innocent appearing), but with 30% error rate
+                base_change = -25  # Mafia looks innocent
+                if self.rng.random() < 0.3:
+                    base_change = 15  # But sometimes the investigation is wrong!
+            else:
+                # Raise suspicion (appears suspicious due to role mismatch), with 20% error rate
+                base_change = -20  # Innocent appears innocent
+                if self.rng.random() < 0.2:
+                    base_change = 20  # But sometimes readings are inverted!
+            
+            # Apply to detective's personal suspicion
+            current_sus = self.suspicion_matrix.get(actor_id, target_id)
+            new_sus = self.clamp_suspicion(current_sus + base_change)
+            self.suspicion_matrix.set(actor_id, target_id, new_sus)
+            
+            # Feedback message (shows suspicion change, not actual role)
+            if base_change < -10:
+                feedback = "🟢 Seems trustworthy"
+            elif base_change > 10:
+                feedback = "🔴 Seems suspicious"
+            else:
+                feedback = "🟡 Unclear"
+            reply = f"🔍 Investigation of **{target_player.name}**: {feedback}"
+        
+        # Last night action in: resolve the night now instead of waiting for the timer
+        self.request_check()
+        return True, reply
+
+    def submit_discussion_action(self, actor_id, action_type, target_id=None):
+        """Record an accuse/defend (with target) or skip. Returns (ok, reply)."""
+        if self.status != 'in-game' or self.phase != 'discussion':
+            return False, "❌ Discussion has already ended."
+        player = self.players.get(actor_id)
+        if not player or not player.is_alive:
+            return False, "You are dead or not playing."
+        if action_type == 'skip':
+            self.discussion_actions_completed.add(actor_id)
+        else:
+            if target_id not in self.players:
+                return False, "❌ Target no longer in game."
+            self.record_discussion_action(actor_id, action_type, target_id)
+        self.touch()
+        self.request_check()
+        return True, None
 
     async def resolve_voting(self, channel):
+        self.resolve_voting_rules()
+        await self.flush_events(channel)
+
+    def resolve_voting_rules(self):
         """
         Resolve voting phase with advanced analysis.
         Checks: Hypocrisy, Consistency, Bandwagoning effects.
         """
-        # Tally Votes - filter out invalid votes
-        counts = {}
-        valid_votes = {}
+        # Tally Votes - retract invalid votes (ledger keeps order/timing of the rest)
         for voter_id, target in self.votes.items():
             # Skip vote if voter or target no longer exists
-            if target == 'SKIP':
-                valid_votes[voter_id] = target
-                counts[target] = counts.get(target, 0) + 1
-            elif voter_id in self.players and target in self.players:
-                valid_votes[voter_id] = target
-                counts[target] = counts.get(target, 0) + 1
-        
-        self.votes = valid_votes  # Update votes to only valid ones
-        
-        eliminated_id = None
-        max_votes = 0
-        
-        # Simple majority/plurality logic
-        for target, count in counts.items():
-            if count > max_votes:
-                max_votes = count
-                eliminated_id = target
-            elif count == max_votes and eliminated_id is not None:
-                eliminated_id = None  # Tie
+            if target != 'SKIP' and (voter_id not in self.players or target not in self.players):
+                self.votes.retract(voter_id)
+        
+        # Simple majority/plurality logic: the live tally already knows the leader (None on a tie)
+        eliminated_id = self.votes.tally.leader
         
         if eliminated_id and eliminated_id != 'SKIP':
             if eliminated_id not in self.players:
                 self.logs.append("⚖️ Target no longer in game.")
             else:
                 victim = self.players[eliminated_id]
-                victim.is_alive = False
+                self.mark_dead(victim)
                 
                 mention = getattr(victim.user, 'mention', None) or f"**{victim.name}**"
                 announcement = f"⚖️ {mention} was executed. Role: **{victim.role.upper()}**"
@@ -806,10 +2420,7 @@ class GameLobby:
                 self.death_log.append((self.round, eliminated_id, victim.role))
                 
                 # Announce publicly as requested (mentions when possible)
-                try:
-                    await channel.send(announcement)
-                except:
-                    pass
+                self.emit('announce', announcement)
                 
                 if victim.role == 'mafia':
                     self.mafia_count -= 1
@@ -823,94 +2434,61 @@ class GameLobby:
                     continue
                 
                 # Check discussion events for accusations
-                accused_anyone_else = any(
-                    evt[1] == voter_id and evt[2] == 'accuse' and evt[3] != voted_target 
-                    for evt in self.discussion_events
-                )
+                accused = self.discussion_events.accused_by(voter_id)
+                accused_vote_target = voted_target in accused
+                accused_anyone_else = len(accused) > accused_vote_target
                 
                 if accused_anyone_else and voted_target != eliminated_id:
                     # Hypocrite!
-                    for obs_id in self.players:
-                        if obs_id != voter_id:
-                            self.update_belief(obs_id, voter_id, WEIGHTS['HYPOCRISY'])
+                    self.update_beliefs(self.players, voter_id, self.weights['HYPOCRISY'])
                 
                 # 2. Consistency Bonus: Did you accuse AND vote the same?
-                if any(evt[1] == voter_id and evt[2] == 'accuse' and evt[3] == voted_target 
-                       for evt in self.discussion_events):
-                    for obs_id in self.players:
-                        if obs_id != voter_id:
-                            self.update_belief(obs_id, voter_id, WEIGHTS['CONSISTENCY'])
+                if accused_vote_target:
+                    self.update_beliefs(self.players, voter_id, self.weights['CONSISTENCY'])
                 
                 # 3. Bandwagon Penalty: Voting late (last 40% of vote order)
-                vote_position = list(self.votes.values()).index(voted_target) if voted_target in self.votes.values() else -1
-                if vote_position >= len(self.votes) * 0.6:  # Last 40%
-                    for obs_id in self.players:
-                        if obs_id != voter_id:
-                            self.update_belief(obs_id, voter_id, WEIGHTS['BANDWAGON'])
+                if self.votes.lateness(voter_id) >= 0.6:  # Last 40%
+                    self.update_beliefs(self.players, voter_id, self.weights['BANDWAGON'])
             
             # --- INNOCENCE/MAFIA PENALTY ---
             # If Innocent dies: everyone who voted for them gains suspicion
             if victim.role != 'mafia':
                 for voter_id, voted_target in self.votes.items():
                     if voted_target == eliminated_id:
-                        for obs_id in self.players:
-                            if obs_id != voter_id:
-                                self.update_belief(obs_id, voter_id, WEIGHTS['VOTE_BAD'])
+                        self.update_beliefs(self.players, voter_id, self.weights['VOTE_BAD'])
         else:
             announcement = "⚖️ No consensus reached. No one died."
             self.logs.append(announcement)
-            try:
-                await channel.send(announcement)
-            except:
-                pass
+            self.emit('announce', announcement)
         self.votes = {}
-        self.discussion_events = []  # Reset for next round
+        self.discussion_events.clear()  # Reset for next round
         self.discussion_actions_completed = set()  # Reset discussion tracking
         
-        # Reset accountability stats for next cycle
+        # Reset accountability stats for next cycle (vote counts reset with the ledger above)
         self.accusation_count = {}
         self.defense_count = {}
-        self.vote_count = {}
+        self.stats_version += 1
         
         # Check Win Condition after voting resolution
-        if self.mafia_count == 0:
-            self.winner = 'villager'
-            self.status = 'finished'
-            await self.update_view(channel, "🏆 **TOWN WINS!** All Mafia eliminated.")
-            # Public final message with survivors and any kicked players
-            try:
-                survivors = [getattr(p.user, 'mention', f"**{p.name}**") for p in self.players.values() if p.is_alive]
-                kicked = getattr(self, 'recent_kicked', [])
-                extra = f"\n⚠️ Eliminated for failing to act: {', '.join(kicked)}" if kicked else ""
-                await channel.send(f"🏆 **TOWN WINS!** Final Survivors: {', '.join(survivors)}{extra}")
-            except:
-                pass
-            return
-        elif self.mafia_count >= self.villager_count:
-            self.winner = 'mafia'
-            self.status = 'finished'
-            await self.update_view(channel, "💀 **MAFIA WINS!** They have taken over the town.")
-            try:
-                survivors = [getattr(p.user, 'mention', f"**{p.name}**") for p in self.players.values() if p.is_alive]
-                kicked = getattr(self, 'recent_kicked', [])
-                extra = f"\n⚠️ Eliminated for failing to act: {', '.join(kicked)}" if kicked else ""
-                await channel.send(f"💀 **MAFIA WINS!** Final Survivors: {', '.join(survivors)}{extra}")
-            except:
-                pass
+        if self._check_game_over():
             return
         
         self.phase = 'night'
-        self.phase_start_time = time.time()
-        self.phase_end_time = time.time() + PHASE_DURATION['night']
+        self.set_phase_deadline(PHASE_DURATION['night'])
         self._setup_night_actions()  # Initialize night actions for new phase
+        self.prefetch_dawn_intro()
         
         # Apply memory decay and rumors at night transition
         self.apply_memory_decay()
         self.generate_rumor()
         
-        await self.update_view(channel, f"🌙 **Night {self.round}** - Roles perform your actions.")
+        self.emit('panel', f"🌙 **Night {self.round}** - Roles perform your actions.")
 
     async def resolve_night(self, channel):
+        self.resolve_night_rules()
+        await self.flush_events(channel)
+
+    def resolve_night_rules(self):
         """
         Resolve night phase with advanced mechanics:
         - Doctor saves and trusts
@@ -943,7 +2521,7 @@ class GameLobby:
         if mafia_votes:
             max_m_votes = max(mafia_votes.values())
             candidates = [t for t, c in mafia_votes.items() if c == max_m_votes]
-            mafia_target = random.choice(candidates) if candidates else None
+            mafia_target = self.rng.choice(candidates) if candidates else None
         
         # --- NIGHT RESOLUTION ---
         killed_this_night = False
@@ -954,39 +2532,33 @@ class GameLobby:
                 if doc_target in self.players:
                     saved_player = self.players[doc_target]
                     mention = getattr(saved_player.user, 'mention', None) or f"**{saved_player.name}**"
-                    try:
-                        await channel.send(f"✨ The **Doctor** saved {mention} tonight! 👏")
-                    except:
-                        pass
+                    self.emit('announce', f"✨ The **Doctor** saved {mention} tonight! 👏")
                 # Doctor Bias: Doctor trusts the person they saved (with margin of error)
                 if doc_target in self.players:
                     doctor_id = next((p.id for p in self.players.values() if p.role == 'doctor' and p.is_alive), None)
                     if doctor_id:
                         # Doctor's trust in saved target (usually -25 suspicion, 25% error reverses it)
                         trust_change = -25
-                        if random.random() < 0.25:
+                        if self.rng.random() < 0.25:
                             trust_change = 15  # Doctor misjudges!
                         current_sus = self.suspicion_matrix.get(doctor_id, doc_target)
                         self.suspicion_matrix.set(doctor_id, doc_target, self.clamp_suspicion(current_sus + trust_change))
                         
                         # Saved person gains trust in doctor (with margin of error)
                         saved_trust_change = -20
-                        if random.random() < 0.2:
+                        if self.rng.random() < 0.2:
                             saved_trust_change = 10  # Misjudgment by saved person
                         current_sus = self.suspicion_matrix.get(doc_target, doctor_id)
                         self.suspicion_matrix.set(doc_target, doctor_id, self.clamp_suspicion(current_sus + saved_trust_change))
             else:
                 victim = self.players[mafia_target]
-                victim.is_alive = False
+                self.mark_dead(victim)
                 killed_this_night = True
                 mention = getattr(victim.user, 'mention', None) or f"**{victim.name}**"
                 announcement = f"💀 {mention} was found dead. Role: **{victim.role.upper()}**"
                 self.logs.append(announcement)
                 self.death_log.append((self.round, mafia_target, victim.role))
-                try:
-                    await channel.send(announcement)
-                except:
-                    pass
+                self.emit('announce', announcement)
                 if victim.role == 'mafia': 
                     self.mafia_count -= 1
                 else: 
@@ -994,10 +2566,7 @@ class GameLobby:
         else:
             announcement = "🌙 A quiet night. No one died."
             self.logs.append(announcement)
-            try:
-                await channel.send(announcement)
-            except:
-                pass
+            self.emit('announce', announcement)
         
         # --- FAILED KILL SUSPICION: If protection succeeded, town blames someone else ---
         if mafia_target and mafia_target == doc_target and mafia_target in self.players:
@@ -1005,14 +2574,14 @@ class GameLobby:
             # Randomly make town slightly suspicious of another player
             other_players = [p for p in self.players.values() if p.id != mafia_target and p.is_alive]
             if other_players:
-                suspected_protector = random.choice(other_players)
+                suspected_protector = self.rng.choice(other_players)
                 # All town slightly suspects this player (might be the doctor/protector)
                 for observer_id in self.players:
                     if observer_id not in (mafia_target, suspected_protector.id):
                         current_sus = self.suspicion_matrix.get(observer_id, suspected_protector.id)
                         # Raise suspicion (looks like they protected someone!)
                         change = 12
-                        if random.random() < 0.35:  # 35% chance to be wrong
+                        if self.rng.random() < 0.35:  # 35% chance to be wrong
                             change = -8
                         self.suspicion_matrix.set(observer_id, suspected_protector.id, self.clamp_suspicion(current_sus + change))
         
@@ -1025,16 +2594,14 @@ class GameLobby:
                 self.logs.append(f"🔍 Detective investigates in shadow...")
         
         # --- MAFIA FRAME-UP (Random Innocent Gets Suspicion) ---
-        if random.random() < 0.4:  # 40% chance
+        if self.rng.random() < 0.4:  # 40% chance
             innocent_players = [
                 p.id for p in self.players.values() 
                 if p.is_alive and p.role != 'mafia'
             ]
             if innocent_players:
-                framed = random.choice(innocent_players)
-                for obs_id in self.players:
-                    if obs_id != framed:
-                        self.update_belief(obs_id, framed, 0.10)  # Small bump
+                framed = self.rng.choice(innocent_players)
+                self.update_beliefs(self.players, framed, 0.10)  # Small bump
         
         # --- HISTORICAL VINDICATION ---
         # Check all dead players from previous rounds
@@ -1047,12 +2614,12 @@ class GameLobby:
                         if dead_id in self.players:
                             for obs_id in self.players:
                                 if obs_id != dead_id:
-                                    self.update_belief(obs_id, obs_id, WEIGHTS['VINDICATION'])
+                                    self.update_belief(obs_id, obs_id, self.weights['VINDICATION'])
                 else:
                     # Innocent died: those who voted for them lose trust
                     for obs_id in self.players:
                         if obs_id != dead_id:
-                            self.update_belief(obs_id, obs_id, WEIGHTS['COMPLICITY'])
+                            self.update_belief(obs_id, obs_id, self.weights['COMPLICITY'])
 
         # --- ACCOUNTABILITY: Eliminate special roles that didn't act ---
         kicked_players = []
@@ -1064,7 +2631,7 @@ class GameLobby:
                 continue
             if player_id not in self.actions_completed:
                 # Special role didn't act - they're eliminated
-                player.is_alive = False
+                self.mark_dead(player)
                 self.logs.append(f"⚠️ **{player.name}** ({player.role.upper()}) failed to act and was eliminated!")
                 self.death_log.append((self.round, player_id, player.role))
                 if player.role == 'mafia':
@@ -1079,81 +2646,47 @@ class GameLobby:
             # Store mentions for final report
             self.recent_kicked = kicked_players
 
-            try:
-                await channel.send(f"⚠️ The following players were eliminated for failing to act: {', '.join(kicked_players)}")
-            except:
-                pass
+            self.emit('announce', f"⚠️ The following players were eliminated for failing to act: {', '.join(kicked_players)}")
 
             self.actions = {}
             self.actions_completed = set()
             self._setup_night_actions()
+            self.set_phase_deadline(PHASE_DURATION['night'])
             
             # Check if game is still active after eliminations
-            if self.mafia_count == 0:
-                self.winner = 'villager'
-                self.status = 'finished'
-                await self.update_view(channel, "🏆 **TOWN WINS!** All Mafia eliminated.")
-                # Send an explicit final message tagging survivors and kicked players
-                try:
-                    survivors = [getattr(p.user, 'mention', f"**{p.name}**") for p in self.players.values() if p.is_alive]
-                    kicked = getattr(self, 'recent_kicked', [])
-                    extra = f"\n⚠️ Eliminated for failing to act: {', '.join(kicked)}" if kicked else ""
-                    await channel.send(f"🏆 **TOWN WINS!** Final Survivors: {', '.join(survivors)}{extra}")
-                except:
-                    pass
-                return
-            elif self.mafia_count >= self.villager_count:
-                self.winner = 'mafia'
-                self.status = 'finished'
-                await self.update_view(channel, "💀 **MAFIA WINS!** They have taken over the town.")
-                try:
-                    survivors = [getattr(p.user, 'mention', f"**{p.name}**") for p in self.players.values() if p.is_alive]
-                    kicked = getattr(self, 'recent_kicked', [])
-                    extra = f"\n⚠️ Eliminated for failing to act: {', '.join(kicked)}" if kicked else ""
-                    await channel.send(f"💀 **MAFIA WINS!** Final Survivors: {', '.join(survivors)}{extra}")
-                except:
-                    pass
+            if self._check_game_over():
                 return
             
-            await self.update_view(channel, f"🌙 **Night {self.round}** (Restart) - Acting roles must choose!")
+            self.emit('panel', f"🌙 **Night {self.round}** (Restart) - Acting roles must choose!")
             return
 
         self.actions = {}
         self.actions_completed = set()  # Reset action tracking
         
         # Check Win Condition after night resolution
-        if self.mafia_count == 0:
-            self.winner = 'villager'
-            self.status = 'finished'
-            await self.update_view(channel, "🏆 **TOWN WINS!** All Mafia eliminated.")
-            return
-        elif self.mafia_count >= self.villager_count:
-            self.winner = 'mafia'
-            self.status = 'finished'
-            await self.update_view(channel, "💀 **MAFIA WINS!** They have taken over the town.")
+        if self._check_game_over(announce_survivors=False):
             return
         
         self.round += 1
         self.phase = 'discussion'
-        self.phase_start_time = time.time()
-        self.phase_end_time = time.time() + PHASE_DURATION['discussion']
+        self.set_phase_deadline(PHASE_DURATION['discussion'])
         self._setup_discussion_actions()  # Initialize discussion participation tracking
         
-        # Flavor Text
+        # Flavor Text (from the narrator's pre-generated pool; never waits on the model)
         intro = "The sun rises on a town gripped by paranoia."
-        if API_KEY and killed_this_night:
-            try:
-                model = genai.GenerativeModel('gemini-1.5-flash')
-                response = model.generate_content(f"Write a 1-sentence gritty noir intro for Day {self.round} of a mafia game with a fresh murder.")
-                intro = response.text
-            except: 
-                pass
+        if self.narrator is not None and killed_this_night:
+            intro = self.narrator.dawn_intro(self.round)
             
-        await self.update_view(channel, f"☀️ **Day {self.round}** - {intro}")
+        self.emit('panel', f"☀️ **Day {self.round}** - {intro}")
+
+    def prefetch_dawn_intro(self):
+        """Top up the intro pool for the coming dawn while the night is played."""
+        if self.narrator is not None:
+            self.narrator.prefetch(self.round + 1)
 
     async def update_view(self, channel, message_content=None):
         embed = self.render_embed()
-        view = GameView(self)
+        view = self.get_view()
 
         # Keep logs briefly then clear at next update
         if self.logs and len(self.logs) > 8:
@@ -1168,6 +2701,7 @@ class GameLobby:
                 msg = await channel.send(content=message_content, embed=embed, view=view)
                 self.last_message = msg
                 self.last_panel_phase = self.phase
+                self._record_render(embed)
                 try:
                     print(f"[DEBUG] Sent lobby panel msg id={getattr(msg, 'id', None)} phase={self.phase}")
                 except:
@@ -1179,6 +2713,7 @@ class GameLobby:
         # Otherwise try to edit the existing message
         try:
             await self.last_message.edit(content=message_content, embed=embed, view=view)
+            self._record_render(embed)
             try:
                 print(f"[DEBUG] Edited panel msg id={getattr(self.last_message, 'id', None)} phase={self.phase} embed_present={embed is not None}")
             except:
@@ -1190,6 +2725,7 @@ class GameLobby:
                 msg = await channel.send(content=message_content, embed=embed, view=view)
                 self.last_message = msg
                 self.last_panel_phase = self.phase
+                self._record_render(embed)
                 try:
                     print(f"[DEBUG] Fallback sent new panel msg id={getattr(msg, 'id', None)} phase={self.phase}")
                 except:
@@ -1197,6 +2733,67 @@ class GameLobby:
             except Exception as e2:
                 print(f"[DEBUG] Fallback send failed: {e2}")
 
+    def get_view(self):
+        """The lobby's single long-lived GameView, reused across every panel send/edit."""
+        if self.view is None:
+            self.view = GameView(self)
+        return self.view
+
+    def _record_render(self, embed):
+        """Tell the render scheduler what the panel now shows, so it doesn't re-send it."""
+        if self.renderer is not None:
+            self.renderer.record_sent(self, embed)
+
+    def _memo_section(self, name, key, build):
+        """Reuse a rendered embed section until its version key changes."""
+        cached = self._embed_sections.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        value = build()
+        self._embed_sections[name] = (key, value)
+        return value
+
+    def _render_roster(self):
+        alive_txt = ""
+        dead_txt = ""
+        for pid, p in self.players.items():
+            if p.is_alive:
+                # Bot indicator only
+                bot_indicator = " 🤖" if p.is_bot else ""
+                
+                # Don't show any role info on shared board for alive players
+                alive_txt += f"**{p.name}**{bot_indicator}\n"
+            else:
+                role_emoji = "💀"
+                bot_emoji = " 🤖" if p.is_bot else ""
+                dead_txt += f"{role_emoji} **{p.name}**{bot_emoji} ← *{p.role.title()}*\n"
+        return alive_txt, dead_txt
+
+    def _render_accountability(self):
+        if not (self.accusation_count or self.defense_count or self.vote_count):
+            return ""
+        stats_lines = []
+        for pid, player in self.players.items():
+            if not player.is_alive:
+                continue
+            accusations = self.accusation_count.get(pid, 0)
+            defenses = self.defense_count.get(pid, 0)
+            votes = self.vote_count.get(pid, 0)
+            
+            # Only show if they have any stats
+            if accusations > 0 or defenses > 0 or votes > 0:
+                stat_str = f"**{player.name}**: "
+                stat_parts = []
+                if accusations > 0:
+                    stat_parts.append(f"🎯{accusations}")
+                if defenses > 0:
+                    stat_parts.append(f"🛡️{defenses}")
+                if votes > 0:
+                    stat_parts.append(f"🗳️{votes}")
+                stat_str += " ".join(stat_parts)
+                stats_lines.append(stat_str)
+        return "\n".join(stats_lines)
+
     def render_embed(self):
         """Enhanced Discord embed with detailed suspicion analytics."""
         color = discord.Color.blue()
@@ -1209,8 +2806,12 @@ class GameLobby:
         elif self.status == 'finished': 
             color = discord.Color.gold()
 
-        # Calculate time remaining in seconds
-        time_remaining = max(0, self.phase_end_time - time.time())
+        # Timer: a client-side relative timestamp needs no periodic edits; countdown text goes stale in seconds
+        if self.timer_display == 'relative' and self.status == 'in-game':
+            timer_text = f"⏱️ Phase ends <t:{int(math.ceil(self.phase_end_time))}:R>"
+        else:
+            time_remaining = max(0, self.phase_end_time - time.time())
+            timer_text = f"⏱️ Time Remaining: {int(time_remaining)}s"
         
         phase_durations = {
             'night': '(30 sec)',
@@ -1221,25 +2822,14 @@ class GameLobby:
 
         embed = discord.Embed(
             title=f"🕵️ Mafia Enhanced - {self.phase.title()} {duration_text}",
-            description=f"⏱️ Time Remaining: {int(time_remaining)}s",
+            description=timer_text,
             color=color
         )
 
-        alive_txt = ""
-        dead_txt = ""
-        
-        # --- ALIVE PLAYERS (without role indicators) ---
-        for pid, p in self.players.items():
-            if p.is_alive:
-                # Bot indicator only
-                bot_indicator = " 🤖" if p.is_bot else ""
-                
-                # Don't show any role info on shared board for alive players
-                alive_txt += f"**{p.name}**{bot_indicator}\n"
-            else:
-                role_emoji = "💀"
-                bot_emoji = " 🤖" if p.is_bot else ""
-                dead_txt += f"{role_emoji} **{p.name}**{bot_emoji} ← *{p.role.title()}*\n"
+        # --- ALIVE PLAYERS / GRAVEYARD (rebuilt only when someone joins, leaves or dies) ---
+        alive_txt, dead_txt = self._memo_section(
+            'roster', (self.players.version, self.life_version), self._render_roster
+        )
 
         embed.add_field(name="👥 Players Alive", value=alive_txt if alive_txt else "None", inline=False)
         
@@ -1262,38 +2852,28 @@ class GameLobby:
         elif self.phase == 'discussion':
             embed.add_field(name="💬 Participants", value=f"{completed}/{required} Acted", inline=True)
         elif self.phase == 'voting':
-            embed.add_field(name="🗳️ Votes", value=f"{completed}/{required} Cast", inline=True)
+            tally = self.votes.tally
+            leader_txt = ""
+            if tally.is_tied:
+                leader_txt = f"\n⚖️ Tied at {tally.max_count}"
+            elif tally.leader == 'SKIP':
+                leader_txt = f"\n⏭️ Skip leads ({tally.max_count})"
+            elif tally.leader in self.players:
+                leader_txt = f"\n📈 **{self.players[tally.leader].name}** leads ({tally.max_count})"
+            embed.add_field(name="🗳️ Votes", value=f"{completed}/{required} Cast{leader_txt}", inline=True)
         
         # --- PLAYER ACCOUNTABILITY STATS ---
-        if self.accusation_count or self.defense_count or self.vote_count:
-            stats_lines = []
-            for pid, player in self.players.items():
-                if not player.is_alive:
-                    continue
-                accusations = self.accusation_count.get(pid, 0)
-                defenses = self.defense_count.get(pid, 0)
-                votes = self.vote_count.get(pid, 0)
-                
-                # Only show if they have any stats
-                if accusations > 0 or defenses > 0 or votes > 0:
-                    stat_str = f"**{player.name}**: "
-                    stat_parts = []
-                    if accusations > 0:
-                        stat_parts.append(f"🎯{accusations}")
-                    if defenses > 0:
-                        stat_parts.append(f"🛡️{defenses}")
-                    if votes > 0:
-                        stat_parts.append(f"🗳️{votes}")
-                    stat_str += " ".join(stat_parts)
-                    stats_lines.append(stat_str)
-            
-            if stats_lines:
-                stats_text = "\n".join(stats_lines)
-                embed.add_field(name="📊 Accountability", value=stats_text, inline=False)
+        stats_text = self._memo_section(
+            'accountability',
+            (self.players.version, self.life_version, self.stats_version, self.votes.version),
+            self._render_accountability
+        )
+        if stats_text:
+            embed.add_field(name="📊 Accountability", value=stats_text, inline=False)
         
         # --- RECENT EVENTS LOG ---
         if self.logs:
-            log_text = "\n".join(self.logs[-5:])  # Last 5 events
+            log_text = "\n".join(self.logs[-5:])  # Last 5 events (a memo key would cost as much as the join)
             embed.add_field(name="📡 Recent Events", value=log_text, inline=False)
         
         # --- FOOTER WITH PHASE INFO ---
@@ -1340,51 +2920,31 @@ class LobbyView(discord.ui.View):
 
     @discord.ui.button(label="Join Game", style=discord.ButtonStyle.primary, custom_id="join_btn")
     async def join_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if self.lobby.status != 'waiting':
-            return await interaction.response.send_message("Game already started!", ephemeral=True)
-        
-        if await self.lobby.add_player(interaction.user):
-            player_count = len(self.lobby.players)
-            await interaction.response.send_message(
-                f"✅ **{interaction.user.name}** joined! ({player_count} players now)",
-                ephemeral=False
-            )
-            # Update the lobby panel to reflect new players
-            try:
-                await self.lobby.update_lobby_panel(interaction.channel)
-                # If now 5 or more players, ensure auto-start is scheduled
-                if len(self.lobby.players) >= 5:
-                    self.lobby.start_auto_start(bot, countdown=30)
-            except:
-                pass
-        else:
-            await interaction.response.send_message("You are already in the lobby.", ephemeral=True)
+        # The lobby actor adds the player and answers through the follow-up
+        await interaction.response.defer()
+        bot.post(self.lobby.channel_id, Join(interaction.user, interaction.channel, interaction))
 
     @discord.ui.button(label="Start Game", style=discord.ButtonStyle.success, custom_id="start_btn")
     async def start_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         if interaction.user.id != self.lobby.host_id:
             return await interaction.response.send_message("Only the host can start the game.", ephemeral=True)
         
-        async with self.lobby.lock:
-            if self.lobby.status != 'waiting':
-                return await interaction.response.send_message("❌ Game already started or in progress.", ephemeral=True)
-            
-            success, msg = self.lobby.start_game()
-            if success:
-                await interaction.response.send_message("🎮 **Game Starting...**", ephemeral=True)
-                # Log start
-                print(f"[DEBUG] Host {interaction.user.id} triggered start_game in channel {interaction.channel.id}")
-                # Store role_reveals (no DM)
-                await self.lobby.send_role_reveals(interaction.channel)
-                # Send the initial game panel (update_view will create a fresh panel for the current phase)
-                await self.lobby.update_view(interaction.channel, msg)
-            else:
-                await interaction.response.send_message(f"❌ {msg}", ephemeral=True)
+        if self.lobby.status != 'waiting':
+            return await interaction.response.send_message("❌ Game already started or in progress.", ephemeral=True)
+        if len(self.lobby.players) < 3:
+            return await interaction.response.send_message("❌ Need at least 3 players.", ephemeral=True)
+        
+        # The lobby actor starts the game (once, even if auto-start fires at the same moment)
+        await interaction.response.send_message("🎮 **Game Starting...**", ephemeral=True)
+        bot.post(self.lobby.channel_id, StartGame(interaction.channel, interaction.user.id, interaction))
 
 class GameView(discord.ui.View):
     def __init__(self, lobby):
         super().__init__(timeout=None)
         self.lobby = lobby
+        # Namespace the static button IDs by channel so every lobby's view can be registered persistently
+        for item in self.children:
+            item.custom_id = f"{GAME_VIEW_ID_PREFIX}:{lobby.channel_id}:{item.custom_id}"
 
     @discord.ui.button(label="Cast Vote / Perform Action", style=discord.ButtonStyle.primary, custom_id="action_menu_btn")
     async def action_menu(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -1512,7 +3072,7 @@ class GameView(discord.ui.View):
             return await interaction.response.send_message("Only the host can end phases.", ephemeral=True)
         
         await interaction.response.send_message(f"⏭️ Phase ended by host.", ephemeral=True)
-        await self.lobby.host_end_phase(interaction.channel)
+        bot.post(self.lobby.channel_id, EndPhase(interaction.channel, self.lobby.round, self.lobby.phase, interaction))
     
     @discord.ui.button(label="View Suspicion Matrix", style=discord.ButtonStyle.secondary, custom_id="view_sus_btn")
     async def view_suspicion(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -1582,31 +3142,22 @@ class TargetSelect(discord.ui.Select):
         
         target_idx = int(self.values[0])
         # Convert dynamic index back to player ID
-        current_players = sorted(self.lobby.players.keys())
-        if target_idx >= len(current_players):
+        target_id = self.lobby.get_player_id_by_index(target_idx)
+        if target_id is None:
             return await interaction.response.send_message("❌ Target no longer in game.", ephemeral=True)
         
-        target_id = current_players[target_idx]
         target_player = self.lobby.players.get(target_id)
         
         if not target_player:
             return await interaction.response.send_message("❌ Target no longer in game.", ephemeral=True)
         
-        # Record the accusation/defense
+        # Acknowledge right away; the lobby actor records the accusation/defense (and tracks stats)
         action_text = "accused" if self.action_type == 'accuse' else "defended"
-        self.lobby.discussion_events.append((self.lobby.round, self.user_id, self.action_type, target_id))
-        self.lobby.discussion_actions_completed.add(self.user_id)
-        
-        # Track stats
-        if self.action_type == 'accuse':
-            self.lobby.accusation_count[target_id] = self.lobby.accusation_count.get(target_id, 0) + 1
-        elif self.action_type == 'defend':
-            self.lobby.defense_count[target_id] = self.lobby.defense_count.get(target_id, 0) + 1
-        
         await interaction.response.send_message(
             f"✅ You {action_text} **{target_player.name}**.",
             ephemeral=True
         )
+        bot.post(self.lobby.channel_id, DiscussionAction(self.user_id, self.action_type, target_id, interaction))
 
 class ActionSelect(discord.ui.Select):
     def __init__(self, lobby, options, placeholder, custom_id):
@@ -1629,7 +3180,7 @@ class ActionSelect(discord.ui.Select):
             action_type = target_id
             if action_type == 'skip':
                 await interaction.response.send_message(f"⏭️ You chose to skip discussion.", ephemeral=True)
-                self.lobby.discussion_actions_completed.add(user_id)
+                bot.post(self.lobby.channel_id, DiscussionAction(user_id, 'skip', None, interaction))
             elif action_type in ['accuse', 'defend']:
                 # Need to select a target
                 alive_targets = [p for p in self.lobby.players.values() if p.is_alive and p.id != user_id]
@@ -1637,7 +3188,11 @@ class ActionSelect(discord.ui.Select):
                     return await interaction.response.send_message("No targets available.", ephemeral=True)
                 
                 # Create target selection menu with dynamic index lookup
-                options = [discord.SelectOption(label=p.name, value=str(self.lobby.get_player_index(p.id))) for p in alive_targets if self.lobby.get_player_index(p.id) >= 0]
+                options = []
+                for p in alive_targets:
+                    idx = self.lobby.get_player_index(p.id)
+                    if idx >= 0:
+                        options.append(discord.SelectOption(label=p.name, value=str(idx)))
                 view = discord.ui.View(timeout=60)
                 select = TargetSelect(self.lobby, user_id, action_type, options)
                 view.add_item(select)
@@ -1647,84 +3202,38 @@ class ActionSelect(discord.ui.Select):
         
         elif self.custom_id == "vote_select":
             if target_id == 'SKIP':
-                self.lobby.votes[user_id] = 'SKIP'
+                target_id_actual = 'SKIP'
                 target_name = 'SKIP'
             else:
                 target_idx = int(target_id)
                 # Convert dynamic index back to player ID
-                current_players = sorted(self.lobby.players.keys())
-                if target_idx >= len(current_players):
-                    return await interaction.response.send_message(f"❌ Target no longer in game.", ephemeral=True)
-                target_id_actual = current_players[target_idx]
+                target_id_actual = self.lobby.get_player_id_by_index(target_idx)
                 if target_id_actual not in self.lobby.players:
                     return await interaction.response.send_message(f"❌ Target no longer in game.", ephemeral=True)
-                self.lobby.votes[user_id] = target_id_actual
                 target_name = self.lobby.players[target_id_actual].name
-                
-                # Track vote stats
-                self.lobby.vote_count[target_id_actual] = self.lobby.vote_count.get(target_id_actual, 0) + 1
             
+            # Acknowledge right away; the lobby actor applies the vote in order with phase changes
             await interaction.response.send_message(f"✅ Vote cast for **{target_name}**.", ephemeral=True)
-            
-            # Track voting completion
-            completed, required = self.lobby.get_phase_progress()
-            if completed >= required:
-                # All players have voted - phase can auto-advance
-                pass
+            bot.post(self.lobby.channel_id, CastVote(user_id, target_id_actual, interaction))
         
         elif self.custom_id == "night_select":
             target_idx = int(target_id)
             # Convert dynamic index back to player ID
-            current_players = sorted(self.lobby.players.keys())
-            if target_idx >= len(current_players):
-                return await interaction.response.send_message(f"❌ Target no longer in game.", ephemeral=True)
-            
-            target_id_actual = current_players[target_idx]
+            target_id_actual = self.lobby.get_player_id_by_index(target_idx)
             if target_id_actual not in self.lobby.players:
                 return await interaction.response.send_message(f"❌ Target no longer in game.", ephemeral=True)
-            
-            self.lobby.actions[user_id] = target_id_actual
-            self.lobby.actions_completed.add(user_id)
-            target_player = self.lobby.players[target_id_actual]
             # Check player is still in lobby
             if not player or not player.is_alive:
                 return await interaction.response.send_message("You are dead or not in the game.", ephemeral=True)
             
-            # Immediate Detective Feedback (suspicion-based, not hard role confirmation)
+            target_player = self.lobby.players[target_id_actual]
             if player.role == 'detective':
-                # Detective investigates: adjust suspicion based on role with margin of error
-                target_role = target_player.role
-                if target_role == 'mafia':
-                    # Lower suspicion (innocent appearing), but with 30% error rate
-                    base_change = -25  # Mafia looks innocent
-                    if random.random() < 0.3:
-                        base_change = 15  # But sometimes the investigation is wrong!
-                else:
-                    # Raise suspicion (appears suspicious due to role mismatch), with 20% error rate
-                    base_change = -20  # Innocent appears innocent
-                    if random.random() < 0.2:
-                        base_change = 20  # But sometimes readings are inverted!
-                
-                # Apply to detective's personal suspicion
-                current_sus = self.lobby.suspicion_matrix.get(user_id, target_id_actual)
-                new_sus = self.lobby.clamp_suspicion(current_sus + base_change)
-                self.lobby.suspicion_matrix.set(user_id, target_id_actual, new_sus)
-                
-                # Feedback message (shows suspicion change, not actual role)
-                if base_change < -10:
-                    feedback = "🟢 Seems trustworthy"
-                elif base_change > 10:
-                    feedback = "🔴 Seems suspicious"
-                else:
-                    feedback = "🟡 Unclear"
-                
-                await interaction.response.send_message(
-                    f"🔍 Investigation of **{target_player.name}**: {feedback}",
-                    ephemeral=True
-                )
+                # The investigation result follows once the lobby actor has applied the action
+                await interaction.response.send_message(f"🔍 Investigating **{target_player.name}**...", ephemeral=True)
             else:
                 action_verb = "Kill" if player.role == 'mafia' else "Save" if player.role == 'doctor' else "Investigate"
                 await interaction.response.send_message(f"✅ Night action confirmed: {action_verb} **{target_player.name}**.", ephemeral=True)
+            bot.post(self.lobby.channel_id, NightAction(user_id, target_id_actual, interaction))
 
 # --- COMMANDS ---
 
@@ -1739,10 +3248,10 @@ async def create_lobby(interaction: discord.Interaction):
                 await interaction.response.send_message("❌ A lobby already exists in this channel.", ephemeral=True)
                 return
             # Remove the finished lobby
-            del bot.lobbies[interaction.channel_id]
+            bot.remove_lobby(interaction.channel_id)
         
         lobby = GameLobby(interaction.channel_id, interaction.user)
-        bot.lobbies[interaction.channel_id] = lobby
+        bot.add_lobby(lobby)
     
     embed = discord.Embed(
         title="🕵️ New Mafia Lobby", 
@@ -1773,7 +3282,7 @@ async def end_game(interaction: discord.Interaction):
         await interaction.response.send_message("❌ Only the host can end the game.", ephemeral=True)
         return
     
-    del bot.lobbies[interaction.channel_id]
+    bot.remove_lobby(interaction.channel_id)
     await interaction.response.send_message("🛑 Game ended.", ephemeral=False)
 
 @bot.tree.command(name="mafia_add_bots", description="Add bot players for testing (host only)")
@@ -1796,8 +3305,23 @@ async def add_bots(interaction: discord.Interaction, count: int, mode: str = "au
         await interaction.response.send_message("❌ Mode must be 'auto' or 'manual'.", ephemeral=True)
         return
     
-    success, message = lobby.add_bots(count, mode.lower())
-    await interaction.response.send_message(f"{'✅' if success else '❌'} {message}", ephemeral=True)
+    await interaction.response.defer(ephemeral=True)
+    bot.post(interaction.channel_id, AddBots(count, mode.lower(), interaction.channel, interaction))
+
+@bot.tree.command(name="mafia_fast_forward", description="Resolve phases as soon as the bots have acted (host only)")
+async def fast_forward(interaction: discord.Interaction, enabled: bool = True):
+    """Toggle fast-forward for bot test games: phases stop waiting on timers and only a final summary is posted."""
+    lobby = bot.lobbies.get(interaction.channel_id)
+    if not lobby:
+        await interaction.response.send_message("❌ No game in this channel.", ephemeral=True)
+        return
+    
+    if interaction.user.id != lobby.host_id:
+        await interaction.response.send_message("❌ Only the host can fast-forward.", ephemeral=True)
+        return
+    
+    await interaction.response.send_message(f"⏩ Fast-forward {'on' if enabled else 'off'}.", ephemeral=True)
+    bot.post(interaction.channel_id, SetFastForward(enabled, interaction.channel, interaction))
 
 @bot.tree.command(name="mafia_stats", description="View detailed game statistics")
 async def game_stats(interaction: discord.Interaction):
@@ -1901,10 +3425,10 @@ async def mafia_create_prefix(ctx):
                 await ctx.send("❌ A lobby already exists in this channel.")
                 return
             # Remove the finished lobby
-            del bot.lobbies[ctx.channel.id]
+            bot.remove_lobby(ctx.channel.id)
         
         lobby = GameLobby(ctx.channel.id, ctx.author)
-        bot.lobbies[ctx.channel.id] = lobby
+        bot.add_lobby(lobby)
     
     embed = discord.Embed(
         title="🕵️ New Mafia Lobby", 
@@ -1931,7 +3455,7 @@ async def mafia_end_prefix(ctx):
         await ctx.send("❌ Only the host can end the game.", delete_after=5)
         return
     
-    del bot.lobbies[ctx.channel.id]
+    bot.remove_lobby(ctx.channel.id)
     await ctx.send("🛑 Game ended.")
 
 @bot.command(name="mafia_add_bots")
@@ -1954,8 +3478,22 @@ async def add_bots_prefix(ctx, count: int = 1, mode: str = "auto"):
         await ctx.send("❌ Mode must be 'auto' or 'manual'.", delete_after=5)
         return
     
-    success, message = lobby.add_bots(count, mode.lower())
-    await ctx.send(f"{'✅' if success else '❌'} {message}")
+    bot.post(ctx.channel.id, AddBots(count, mode.lower(), ctx.channel))
+
+@bot.command(name="mafia_fast_forward")
+async def fast_forward_prefix(ctx, enabled: bool = True):
+    """Toggle fast-forward using &mafia_fast_forward [on/off]"""
+    lobby = bot.lobbies.get(ctx.channel.id)
+    if not lobby:
+        await ctx.send("❌ No active game in this channel.", delete_after=5)
+        return
+    
+    if ctx.author.id != lobby.host_id:
+        await ctx.send("❌ Only the host can fast-forward.", delete_after=5)
+        return
+    
+    await ctx.send(f"⏩ Fast-forward {'on' if enabled else 'off'}.")
+    bot.post(ctx.channel.id, SetFastForward(enabled, ctx.channel))
 
 @bot.command(name="mafia_stats")
 async def game_stats_prefix(ctx):
@@ -1995,7 +3533,8 @@ async def game_stats_prefix(ctx):
     
     await ctx.send(embed=embed)
 
-if TOKEN:
-    bot.run(TOKEN)
-else:
-    print("❌ DISCORD_TOKEN not found in .env file")
\ No newline at end of file
+if __name__ == '__main__':
+    if TOKEN:
+        bot.run(TOKEN, root_logger=True)  # discord.py's log handler also prints this module's log
+    else:
+        print("❌ DISCORD_TOKEN not found in .env file")
\ No newline at end of file
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Headless Mafia games and the Monte Carlo balance runner.
+
+Runs complete bot-only games in memory on GameLobby's synchronous rule
+methods (start_game, run_bot_actions, advance_phase_rules), with no
+Discord objects involved. The events a game emits (announcements and
+panel updates, normally rendered by GameLobby.flush_events) can be kept
+as a transcript for regression checks.
+
+As a script it sweeps player counts, WEIGHTS overrides and role setups
+across a process pool and reports win rates, game lengths and suspicion
+accuracy with 95% confidence intervals:
+
+    python simulation.py --players 5-12 --games 10000 --set VOTE_BAD=0.15,0.25,0.35 --mafia-divisor 3 4
+"""
+import argparse
+import itertools
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from bot import GameLobby, Player, ROLE_SETUP, WEIGHTS
+
+MAX_ROUNDS = 50  # Safety cap; real games end long before this
+BATCH_SIZE = 250  # Games per worker task: large enough to amortize pickling, small enough to balance cores
+Z_95 = 1.96
+
+
+def build_lobby(player_count, weights=None, role_setup=None, seed=None):
+    """A headless lobby (no host, no channel) filled with auto-mode bots."""
+    lobby = GameLobby(0, weights=weights, role_setup=role_setup, seed=seed)
+    for i in range(player_count):
+        player = Player(is_bot=True, bot_name=f"Bot {i + 1}")
+        player.id = i + 1  # Small, stable ids keep transcripts readable and reproducible
+        lobby.players[player.id] = player
+    lobby.bot_mode = 'auto'
+    return lobby
+
+
+def run_game(player_count=7, seed=None, max_rounds=MAX_ROUNDS, transcript=False, weights=None, role_setup=None):
+    """
+    Play one bot-only game to the end and return a summary dict:
+    winner ('villager', 'mafia' or None if the round cap hit), rounds,
+    players, deaths [(round, player_id, role)], accuracy (mean share of
+    town players whose top suspect was mafia when each vote closed, or
+    None) and, with transcript=True, every (kind, text) event emitted.
+    """
+    lobby = build_lobby(player_count, weights, role_setup, seed)  # Every draw comes from the lobby's own RNG
+    success, msg = lobby.start_game()
+    if not success:
+        raise ValueError(msg)
+
+    events = []
+    accuracy = []
+    while lobby.status == 'in-game' and lobby.round <= max_rounds:
+        lobby.run_bot_actions()
+        if lobby.phase == 'voting':
+            sample = lobby.suspicion_accuracy()
+            if sample is not None:
+                accuracy.append(sample)
+        lobby.advance_phase_rules()
+        if transcript:
+            events.extend(lobby.events)
+        lobby.events.clear()
+        del lobby.logs[:-8]  # The panel only ever shows the tail
+
+    result = {
+        'winner': lobby.winner,
+        'rounds': lobby.round,
+        'players': player_count,
+        'deaths': list(lobby.death_log),
+        'accuracy': sum(accuracy) / len(accuracy) if accuracy else None,
+    }
+    if transcript:
+        result['events'] = events
+    return result
+
+
+# --- Batch statistics ---
+
+def empty_stats():
+    return {'games': 0, 'town_wins': 0, 'mafia_wins': 0, 'rounds': 0.0, 'rounds_sq': 0.0,
+            'accuracy': 0.0, 'accuracy_sq': 0.0, 'accuracy_games': 0}
+
+
+def merge_stats(total, part):
+    for key, value in part.items():
+        total[key] += value
+    return total
+
+
+def run_batch(player_count, games, seed_start, weights=None, role_setup=None):
+    """Worker task: play `games` seeded games and return summed statistics (cheap to pickle)."""
+    stats = empty_stats()
+    for seed in range(seed_start, seed_start + games):
+        result = run_game(player_count, seed=seed, weights=weights, role_setup=role_setup)
+        stats['games'] += 1
+        stats['town_wins'] += result['winner'] == 'villager'
+        stats['mafia_wins'] += result['winner'] == 'mafia'
+        stats['rounds'] += result['rounds']
+        stats['rounds_sq'] += result['rounds'] ** 2
+        if result['accuracy'] is not None:
+            stats['accuracy'] += result['accuracy']
+            stats['accuracy_sq'] += result['accuracy'] ** 2
+            stats['accuracy_games'] += 1
+    return stats
+
+
+def wilson_interval(successes, n, z=Z_95):
+    """Wilson score interval for a binomial proportion, as (low, high)."""
+    if n == 0:
+        return 0.0, 1.0
+    p = successes / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def mean_interval(total, total_sq, n, z=Z_95):
+    """Mean and normal-approximation half-width from a sum and a sum of squares."""
+    if n == 0:
+        return 0.0, 0.0
+    mean = total / n
+    variance = max(0.0, total_sq / n - mean * mean) * n / max(1, n - 1)
+    return mean, z * math.sqrt(variance / n)
+
+
+def summarize(stats):
+    """Win rate (with Wilson CI), mean game length and accuracy (with CIs) from merged stats."""
+    n = stats['games']
+    low, high = wilson_interval(stats['town_wins'], n)
+    rounds, rounds_ci = mean_interval(stats['rounds'], stats['rounds_sq'], n)
+    accuracy, accuracy_ci = mean_interval(stats['accuracy'], stats['accuracy_sq'], stats['accuracy_games'])
+    return {
+        'games': n,
+        'town_win_rate': stats['town_wins'] / n if n else 0.0,
+        'town_win_ci': (low, high),
+        'rounds': rounds,
+        'rounds_ci': rounds_ci,
+        'accuracy': accuracy,
+        'accuracy_ci': accuracy_ci,
+    }
+
+
+def run_configs(configs, games, workers=None, seed=0, batch_size=BATCH_SIZE):
+    """
+    Play `games` games for every (player_count, weights, role_setup)
+    config, spread over a process pool in batches. Every config reuses the
+    same seed range, so configs are compared on identical role draws.
+    Returns one summarize() dict per config, in order.
+    """
+    totals = [empty_stats() for _ in configs]
+    jobs = []
+    for index, (player_count, weights, role_setup) in enumerate(configs):
+        for start in range(0, games, batch_size):
+            jobs.append((index, (player_count, min(batch_size, games - start), seed + start, weights, role_setup)))
+    if workers == 1:
+        for index, args in jobs:
+            merge_stats(totals[index], run_batch(*args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            futures = [(index, pool.submit(run_batch, *args)) for index, args in jobs]
+            for index, future in futures:
+                merge_stats(totals[index], future.result())
+    return [summarize(stats) for stats in totals]
+
+
+# --- CLI ---
+
+def parse_range(text):
+    """'5-12' or '5,7,9' -> list of ints."""
+    values = []
+    for part in text.split(','):
+        if '-' in part:
+            low, high = part.split('-')
+            values.extend(range(int(low), int(high) + 1))
+        else:
+            values.append(int(part))
+    return values
+
+
+def parse_weight_axes(settings):
+    """['VOTE_BAD=0.1,0.2', ...] -> list of WEIGHTS override dicts (cartesian product)."""
+    axes = []
+    for setting in settings or []:
+        key, _, values = setting.partition('=')
+        if key not in WEIGHTS:
+            raise SystemExit(f"Unknown weight {key!r}; expected one of: {', '.join(WEIGHTS)}")
+        axes.append([(key, float(v)) for v in values.split(',')])
+    return [dict(combo) for combo in itertools.product(*axes)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo balance sweep over simulated bot-only games.")
+    parser.add_argument('--players', default='5-12', help="player counts, e.g. 5-12 or 5,7,9")
+    parser.add_argument('--games', type=int, default=2000, help="games per configuration")
+    parser.add_argument('--set', action='append', metavar='KEY=V1,V2', help="WEIGHTS values to sweep (repeatable)")
+    parser.add_argument('--mafia-divisor', type=int, nargs='+', default=[ROLE_SETUP['mafia_divisor']],
+                        help="mafia = max(1, players // divisor)")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    configs, labels = [], []
+    for players, overrides, divisor in itertools.product(
+            parse_range(args.players), parse_weight_axes(args.set), args.mafia_divisor):
+        weights = {**WEIGHTS, **overrides}
+        role_setup = {**ROLE_SETUP, 'mafia_divisor': divisor}
+        configs.append((players, weights, role_setup))
+        label = " ".join(f"{k}={v:g}" for k, v in overrides.items())
+        labels.append((players, f"div={divisor} {label}".strip()))
+
+    started = time.time()
+    summaries = run_configs(configs, args.games, workers=args.workers, seed=args.seed)
+    elapsed = time.time() - started
+
+    print(f"{'players':>7}  {'config':<32} {'town win % (95% CI)':<24} {'rounds':<14} {'accuracy':<14}")
+    for (players, label), summary in zip(labels, summaries):
+        low, high = summary['town_win_ci']
+        print(f"{players:>7}  {label:<32} "
+              f"{summary['town_win_rate'] * 100:5.1f} ({low * 100:4.1f}-{high * 100:4.1f}){'':<8} "
+              f"{summary['rounds']:5.2f} ±{summary['rounds_ci']:.2f}   "
+              f"{summary['accuracy'] * 100:5.1f}% ±{summary['accuracy_ci'] * 100:.1f}")
+    total = len(configs) * args.games
+    print(f"\n{total} games in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} games/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -48,23 +48,19 @@ def test_index_based_ids():
     success, msg = lobby.add_bots(2, 'auto')
     print(f"Bot add result: {success}, {msg}")
     
-    # Start the game to initialize player_list
     success, msg = lobby.start_game()
     print(f"Game start result: {success}, {msg}")
     
-    # Test player_list
-    print(f"\nPlayer list (indices): {list(range(len(lobby.player_list)))}")
-    print(f"Player IDs in order: {lobby.player_list}")
-    
-    # Test get_player_by_index
-    for i in range(len(lobby.player_list)):
-        player = lobby.get_player_by_index(i)
-        player_id = lobby.player_list[i]
+    # Test get_player_id_by_index
+    for i in range(len(lobby.players)):
+        player_id = lobby.get_player_id_by_index(i)
+        player = lobby.players[player_id]
         print(f"Index {i}: {player.name} (ID: {player_id})")
     
     # Test get_player_index
-    for pid in lobby.player_list:
+    for pid in lobby.players:
         idx = lobby.get_player_index(pid)
+        assert lobby.get_player_id_by_index(idx) == pid
         print(f"Player ID {pid} -> Index {idx}")
     
     print("\n✅ All index-based ID tests passed!")
@@ -259,3 +255,963 @@ def test_reveal_role_button_ephemeral():
     assert "DETECTIVE" in content and ephemeral_flag is True, "Expected ephemeral message with role"
     print("✅ Reveal Role ephemeral button test passed")
 
+
+def test_dense_suspicion_matrix():
+    print("Testing dense suspicion matrix backend...")
+    from bot import DenseSuspicionMatrix, BASELINE_SUSPICION, EPSILON
+
+    ids = [9000000001, 9000000002, 9000000003]
+    matrix = DenseSuspicionMatrix(ids)
+
+    # Missing pairs read as the default and are not materialized
+    assert matrix.get(ids[0], ids[1]) == BASELINE_SUSPICION
+    assert matrix.get_all_for_observer(ids[0]) == {}
+    assert matrix.get(ids[0], ids[0]) is None
+
+    matrix.set(ids[0], ids[1], 150)
+    matrix.set(ids[2], ids[1], 40)
+    assert matrix.get(ids[0], ids[1]) == 100 - EPSILON
+    assert matrix.get_all_for_observer(ids[0]) == {ids[1]: 100 - EPSILON}
+    assert abs(matrix.get_average_suspicion(ids[1]) - (95 + 40) / 2) < 1e-4
+    assert abs(matrix.get_average_suspicion(ids[1], exclude_id=ids[0]) - 40) < 1e-4
+
+    # Unknown players grow the array on write
+    for extra in range(10):
+        matrix.set(extra, ids[1], 50)
+    assert len(matrix) == 13 and matrix.get(9, ids[1]) == 50
+    print("✅ dense suspicion matrix test passed")
+
+
+def test_batched_update_beliefs_matches_scalar():
+    print("Testing batched belief updates against the scalar engine...")
+    random.seed(1)
+    host = MockUser(99999, "Host")
+    lobby = GameLobby(55555, host)
+    for uid in range(1, 2001):
+        lobby.players[uid] = Player(MockUser(uid, f"P{uid}"))
+    observers = [uid for uid in lobby.players if uid != 1]
+
+    # Batched pass over a suspicious-looking column (confirmation bias kicks in)
+    for obs in observers:
+        lobby.suspicion_matrix.set(obs, 1, 70)
+    lobby.update_beliefs(lobby.players, 1, 10)
+    batched = [lobby.suspicion_matrix.get(obs, 1) for obs in observers]
+
+    # Scalar reference on the same starting column
+    for obs in observers:
+        lobby.suspicion_matrix.set(obs, 1, 70)
+        lobby.update_belief(obs, 1, 10)
+    scalar = [lobby.suspicion_matrix.get(obs, 1) for obs in observers]
+
+    mean_batched = sum(batched) / len(batched)
+    mean_scalar = sum(scalar) / len(scalar)
+    assert abs(mean_batched - mean_scalar) < 1.0, (mean_batched, mean_scalar)
+    assert all(5 <= v <= 95 for v in batched)
+    # Roughly 5% of observers misinterpret and move the other way
+    flipped = sum(1 for v in batched if v < 70)
+    assert 40 <= flipped <= 170, flipped
+    print("✅ batched belief update test passed")
+
+
+def test_lazy_memory_decay():
+    print("Testing lazy epoch-based memory decay...")
+    from bot import DenseSuspicionMatrix, BASELINE_SUSPICION, WEIGHTS
+    matrix = DenseSuspicionMatrix([1, 2, 3])
+    matrix.set(1, 2, 80)
+    matrix.set(3, 2, 10)
+
+    # Eager reference: the old per-round rewrite
+    expected = {1: 80.0, 3: 10.0}
+    for _ in range(3):
+        matrix.advance_epoch()
+        for obs in expected:
+            expected[obs] = expected[obs] * WEIGHTS['MEMORY_DECAY'] + BASELINE_SUSPICION * (1 - WEIGHTS['MEMORY_DECAY'])
+
+    assert abs(matrix.get(1, 2) - expected[1]) < 1e-3
+    assert abs(matrix.get(3, 2) - expected[3]) < 1e-3
+    assert abs(matrix.get_column([1, 3], 2)[0] - expected[1]) < 1e-3
+    assert abs(matrix.get_average_suspicion(2) - (expected[1] + expected[3]) / 2) < 1e-3
+
+    # A write stamps the current epoch, so only later rounds decay it
+    matrix.set(1, 2, 90)
+    matrix.advance_epoch()
+    assert abs(matrix.get(1, 2) - (90 * WEIGHTS['MEMORY_DECAY'] + BASELINE_SUSPICION * (1 - WEIGHTS['MEMORY_DECAY']))) < 1e-3
+    # Unset cells stay unset
+    assert matrix.get(2, 1) == BASELINE_SUSPICION and 1 not in matrix.get_all_for_observer(2)
+    print("✅ lazy memory decay test passed")
+
+
+def test_column_aggregates():
+    print("Testing O(1) column aggregates and suspect ranking...")
+    from bot import DenseSuspicionMatrix, BASELINE_SUSPICION
+    matrix = DenseSuspicionMatrix([1, 2, 3, 4])
+    matrix.set(1, 2, 80)
+    matrix.set(3, 2, 60)
+    matrix.set(1, 3, 20)
+    matrix.set(4, 4, 50)  # self-suspicion is ignored
+    matrix.set_column([1, 2, 4], 3, [30, 40, 50])
+    matrix.advance_epoch(2)
+    matrix.set(4, 2, 90)
+
+    def brute_average(target, exclude=None):
+        vals = [v for obs in matrix.ids if obs not in (target, exclude)
+                for v in [matrix.get(obs, target, default=None)] if v is not None]
+        return sum(vals) / len(vals)
+
+    for target in (2, 3):
+        assert abs(matrix.get_average_suspicion(target) - brute_average(target)) < 1e-3
+        assert abs(matrix.get_average_suspicion(target, exclude_id=1) - brute_average(target, 1)) < 1e-3
+
+    means = matrix.column_means([1, 2, 3, 99])
+    assert abs(means[1] - brute_average(2)) < 1e-3 and abs(means[2] - brute_average(3)) < 1e-3
+    assert means[0] == means[3] == BASELINE_SUSPICION   # Nobody has a read on them
+    assert abs(matrix.column_means([2], exclude_ids=[4])[0] - (brute_average(2) * 3 - matrix.get(4, 2)) / 2) < 1e-3
+    assert matrix.column_means([2], exclude_ids=[1, 3, 4])[0] == BASELINE_SUSPICION
+
+    top_id, top_value = matrix.most_suspected()
+    assert top_id == 2 and abs(top_value - brute_average(2)) < 1e-3
+    assert matrix.least_suspected()[0] == 3
+    assert matrix.most_suspected(candidates={3})[0] == 3
+    assert matrix.most_suspected(candidates={1}) is None
+    matrix.set(1, 3, 99)
+    matrix.set(4, 3, 99)
+    matrix.advance_epoch(3)
+    top_id, top_value = matrix.most_suspected()   # The stale heap entry for column 3 is skipped
+    assert top_id == 3 and abs(top_value - brute_average(3)) < 1e-3
+    print("✅ column aggregate test passed")
+
+
+def test_discussion_event_log_indexes():
+    print("Testing indexed discussion event store...")
+    from bot import DiscussionEventLog
+    log = DiscussionEventLog()
+    log.record(1, 10, 'accuse', 20)
+    log.record(1, 10, 'accuse', 30)
+    log.record(1, 11, 'defend', 20)
+    log.append((2, 12, 'accuse', 20))
+
+    assert len(log) == 4 and list(log)[0] == (1, 10, 'accuse', 20)
+    assert log.accused_by(10) == {20, 30}
+    assert log.accused_by(11) == set()
+    assert log.accusers_of[20] == {10, 12}
+    assert log.defenders_of[20] == {11}
+    assert len(log.by_round[1]) == 3 and len(log.by_round[2]) == 1
+
+    log.clear()
+    assert len(log) == 0 and log.accused_by(10) == set()
+    print("✅ discussion event log test passed")
+
+
+def test_vote_ledger_order_and_lateness():
+    print("Testing ordered vote ledger...")
+    from bot import VoteLedger
+    ledger = VoteLedger()
+    ledger.cast(1, 'SKIP')
+    ledger[2] = 10
+    ledger[3] = 10
+    ledger[4] = 20
+    assert [ledger.ordinal(v) for v in (1, 2, 3, 4)] == [0, 1, 2, 3]
+
+    # Changing a vote moves the voter to the back; re-voting the same target doesn't
+    assert ledger.cast(1, 20) == 'SKIP'
+    ledger.cast(2, 10)
+    assert [ledger.ordinal(v) for v in (2, 3, 4, 1)] == [0, 1, 2, 3]
+    assert ledger.lateness(1) == 0.75 and ledger.lateness(2) == 0.0
+    assert ledger.sequence(1) > ledger.sequence(4)
+    assert ledger.timestamp(1) >= ledger.timestamp(4)
+
+    assert ledger.retract(3) == 10 and 3 not in ledger and ledger.ordinal(3) == -1
+    assert dict(ledger.items()) == {2: 10, 4: 20, 1: 20} and len(ledger) == 3
+
+    # GameLobby wraps plain dicts assigned to votes
+    lobby = GameLobby(1, MockUser(99999, "Host"))
+    lobby.votes = {5: 6}
+    assert isinstance(lobby.votes, VoteLedger) and lobby.votes[5] == 6
+    print("✅ vote ledger test passed")
+
+
+def test_vote_tally_tracks_changes():
+    print("Testing incremental vote tally...")
+    from bot import VoteLedger
+    ledger = VoteLedger()
+    ledger[1] = 10
+    ledger[2] = 10
+    ledger[3] = 20
+    tally = ledger.tally
+    assert tally.leader == 10 and tally.max_count == 2 and not tally.is_tied
+
+    ledger[2] = 20  # change: 10 -> 20
+    assert tally.counts == {10: 1, 20: 2} and tally.leader == 20
+
+    ledger[1] = 20
+    ledger.retract(3)
+    ledger[4] = 'SKIP'
+    assert tally.counts == {20: 2, 'SKIP': 1} and tally.leader == 20
+    ledger.retract(2)
+    assert tally.is_tied and tally.leader is None and tally.max_count == 1
+    ledger.retract(1)
+    ledger.retract(4)
+    assert tally.counts == {} and tally.leader is None and tally.max_count == 0
+    print("✅ vote tally test passed")
+
+
+def test_player_index_cache():
+    print("Testing cached player index map...")
+    lobby = GameLobby(1, MockUser(500, "Host"))
+    lobby.players[300] = Player(MockUser(300, "A"))
+    lobby.players[700] = Player(MockUser(700, "B"))
+    assert [lobby.get_player_index(pid) for pid in (300, 500, 700)] == [0, 1, 2]
+    assert lobby.get_player_id_by_index(2) == 700 and lobby.get_player_id_by_index(3) is None
+
+    version = lobby.players.version
+    lobby.players[300] = Player(MockUser(300, "A2"))  # Replacing a player is a change too
+    assert lobby.players.version == version + 1
+    assert lobby.get_player_index(300) == 0
+
+    lobby.players[100] = Player(MockUser(100, "C"))
+    del lobby.players[700]
+    assert lobby.players.version == version + 3
+    assert [lobby.get_player_id_by_index(i) for i in range(3)] == [100, 300, 500]
+    assert lobby.get_player_index(700) == -1
+    print("✅ player index cache test passed")
+
+
+def test_phase_scheduler_wakes_on_deadlines():
+    print("Testing deadline scheduler...")
+    import time as _time
+    from bot import PhaseScheduler
+
+    async def run():
+        scheduler = PhaseScheduler()
+        now = _time.time()
+        scheduler.schedule(1, now + 0.2, 'phase')
+        scheduler.schedule(2, now + 0.05, 'refresh')
+        first = await scheduler.wait_due()
+        assert [(cid, kind) for _, cid, kind in first] == [(2, 'refresh')]
+        # An earlier deadline scheduled while waiting wakes the loop immediately
+        waiter = asyncio.ensure_future(scheduler.wait_due())
+        await asyncio.sleep(0.01)
+        scheduler.schedule(3, _time.time(), 'check')
+        second = await asyncio.wait_for(waiter, 0.1)
+        assert [cid for _, cid, _ in second] == [3]
+        third = await scheduler.wait_due()
+        assert [cid for _, cid, _ in third] == [1] and _time.time() >= now + 0.2
+
+    asyncio.run(run())
+
+    # Lobbies keep one live entry per timer kind; superseded entries are ignored
+    lobby = GameLobby(42, MockUser(1, "Host"))
+    scheduler = PhaseScheduler()
+    lobby.attach_scheduler(scheduler)
+    lobby.schedule_tick('phase', 100.0)
+    lobby.schedule_tick('phase', 200.0)
+    assert not lobby.is_live_tick('phase', 100.0) and lobby.is_live_tick('phase', 200.0)
+    assert len(scheduler) == 2
+    print("✅ deadline scheduler test passed")
+
+
+def test_game_loop_isolates_slow_lobbies():
+    print("Testing concurrent per-lobby timer processing...")
+    import time as _time
+    from bot import bot as mafia_bot
+
+    finished = []
+
+    async def fake_handle_timer(lobby, kind, when):
+        if lobby.channel_id == 1:
+            await asyncio.sleep(0.2)  # Slow Discord edit
+        finished.append((lobby.channel_id, kind))
+
+    async def run():
+        slow = GameLobby(1, MockUser(10, "Slow"))
+        fast = GameLobby(2, MockUser(20, "Fast"))
+        for lobby in (slow, fast):
+            lobby.status = 'in-game'
+            mafia_bot.lobbies[lobby.channel_id] = lobby
+        original = mafia_bot.handle_timer
+        mafia_bot.handle_timer = fake_handle_timer
+        try:
+            now = _time.time()
+            mafia_bot.dispatch_timer(1, now, 'refresh')
+            mafia_bot.dispatch_timer(1, now, 'phase')
+            mafia_bot.dispatch_timer(2, now, 'phase')
+            await asyncio.gather(*mafia_bot.lobby_tasks.values())
+        finally:
+            mafia_bot.handle_timer = original
+            mafia_bot.lobbies.clear()
+            mafia_bot.lobby_tasks.clear()
+
+    asyncio.run(run())
+    # The fast lobby isn't stuck behind the slow one; the slow lobby's timers stay in order
+    assert finished == [(2, 'phase'), (1, 'refresh'), (1, 'phase')], finished
+    print("✅ concurrent lobby processing test passed")
+
+
+def test_overrunning_handler_frees_its_slot():
+    print("Testing overrunning lobby handlers and loop health reports...")
+    import unittest
+    import bot as bot_module
+    from bot import bot as mafia_bot, LOOP_REPORT_INTERVAL
+
+    finished = []
+
+    async def fake_handle_timer(lobby, kind, when):
+        if lobby.channel_id == 1:
+            await asyncio.sleep(0.3)  # Stuck well past the timeout
+        finished.append(lobby.channel_id)
+
+    async def run():
+        for channel_id in (1, 2):
+            lobby = GameLobby(channel_id, MockUser(channel_id * 10, "Host"))
+            lobby.status = 'in-game'
+            mafia_bot.lobbies[channel_id] = lobby
+        original = (mafia_bot.handle_timer, mafia_bot.timer_semaphore, bot_module.LOBBY_TIMER_TIMEOUT)
+        mafia_bot.handle_timer = fake_handle_timer
+        mafia_bot.timer_semaphore = asyncio.Semaphore(1)   # A single slot, held by the stuck lobby at first
+        bot_module.LOBBY_TIMER_TIMEOUT = 0.05
+        timeouts = mafia_bot.loop_metrics.timeouts
+        try:
+            mafia_bot.dispatch_timer(1, 0, 'phase')
+            await asyncio.sleep(0)
+            mafia_bot.dispatch_timer(2, 0, 'phase')
+            await asyncio.gather(*mafia_bot.lobby_tasks.values())
+        finally:
+            mafia_bot.handle_timer, mafia_bot.timer_semaphore, bot_module.LOBBY_TIMER_TIMEOUT = original
+            mafia_bot.lobbies.clear()
+            mafia_bot.lobby_tasks.clear()
+        return mafia_bot.loop_metrics.timeouts - timeouts
+
+    # The stuck handler still completes (never cancelled) but gives up its slot once it times out
+    assert asyncio.run(run()) == 1 and finished == [2, 1], finished
+
+    with unittest.TestCase().assertLogs('bot', level='INFO') as logs:
+        stats = mafia_bot.report_loop_health(mafia_bot.last_loop_report + LOOP_REPORT_INTERVAL)
+    assert stats['timeouts'] >= 1 and 'timeouts=' in logs.output[0]
+    assert mafia_bot.report_loop_health(mafia_bot.last_loop_report + 1) is None   # Not due again yet
+    print("✅ overrunning handler test passed")
+
+
+def test_render_scheduler_dedupes_and_rate_limits():
+    print("Testing render scheduler diffing and token bucket...")
+    from bot import RenderScheduler, PhaseScheduler
+
+    channel = MockChannel()
+    lobby = GameLobby(66666, MockUser(99999, "Host"))
+    lobby.players[11111] = Player(MockUser(11111, "Alice"))
+    lobby.status = 'in-game'
+    lobby.phase_end_time = 0
+    lobby.last_message = MockMessage(channel, content="panel")
+    renderer = RenderScheduler()
+    lobby.renderer = renderer
+    lobby.attach_scheduler(PhaseScheduler())
+
+    async def run():
+        assert await renderer.flush(lobby)          # First render goes out
+        assert not await renderer.flush(lobby)      # Identical embed is skipped
+        assert renderer.edits == 1 and renderer.skipped == 1
+        bucket = renderer.bucket(lobby.channel_id)
+        bucket.tokens = 0
+        lobby.logs.append("Something happened")
+        lobby.touch()
+        assert not await renderer.flush(lobby)      # Changed, but no budget: deferred
+        assert renderer.deferred == 1 and lobby.timer_marks['render'] > 0
+
+    asyncio.run(run())
+    assert len(channel.messages) == 1
+    print("✅ render scheduler test passed")
+
+
+def test_relative_timer_rendering():
+    print("Testing relative-timestamp timer rendering...")
+    from bot import PhaseScheduler
+    lobby = GameLobby(12121, MockUser(99999, "Host"))
+    lobby.players[11111] = Player(MockUser(11111, "Alice"))
+    lobby.players[22222] = Player(MockUser(22222, "Bob"))
+    lobby.timer_display = 'relative'
+    lobby.attach_scheduler(PhaseScheduler())
+    lobby.start_game()
+
+    embed = lobby.render_embed()
+    assert embed.description == f"⏱️ Phase ends <t:{int(-(-lobby.phase_end_time // 1))}:R>"
+    # The embed is stable over time, and no periodic refresh is scheduled
+    assert lobby.render_embed().to_dict() == embed.to_dict()
+    assert 'refresh' not in lobby.timer_marks
+
+    lobby.timer_display = 'countdown'
+    assert "Time Remaining" in lobby.render_embed().description
+    print("✅ relative timer rendering test passed")
+
+
+def test_render_embed_section_memoization():
+    print("Testing memoized render_embed sections...")
+    lobby = GameLobby(13131, MockUser(99999, "Host"))
+    for uid, name in [(11111, "Alice"), (22222, "Bob"), (33333, "Carol")]:
+        lobby.players[uid] = Player(MockUser(uid, name))
+    lobby.start_game()
+
+    lobby.render_embed()
+    roster = lobby._embed_sections['roster']
+    lobby.render_embed()
+    assert lobby._embed_sections['roster'] is roster   # Nothing changed: reused
+
+    # Replacing a player under the same id rebuilds it
+    replacement = Player(MockUser(22222, "Bobby"))
+    replacement.role, replacement.is_alive = lobby.players[22222].role, True
+    lobby.players[22222] = replacement
+    assert "Bobby" in {f['name']: f['value'] for f in lobby.render_embed().to_dict()['fields']}["👥 Players Alive"]
+    roster = lobby._embed_sections['roster']
+
+    # A death rebuilds the roster and moves the player to the graveyard
+    lobby.mark_dead(lobby.players[33333])
+    fields = {f['name']: f['value'] for f in lobby.render_embed().to_dict()['fields']}
+    assert lobby._embed_sections['roster'] is not roster
+    assert "Carol" in fields["⚰️ Graveyard"] and "Carol" not in fields["👥 Players Alive"]
+
+    # Accountability follows accusations and votes
+    lobby.record_discussion_action(11111, 'accuse', 22222)
+    fields = {f['name']: f['value'] for f in lobby.render_embed().to_dict()['fields']}
+    assert fields["📊 Accountability"] == "**Bobby**: 🎯1"
+    lobby.votes[11111] = 22222
+    fields = {f['name']: f['value'] for f in lobby.render_embed().to_dict()['fields']}
+    assert fields["📊 Accountability"] == "**Bobby**: 🎯1 🗳️1"
+    print("✅ render_embed memoization test passed")
+
+
+def test_persistent_game_view_registry():
+    print("Testing persistent per-lobby game view...")
+    import asyncio
+    from bot import MafiaBot, GameView, Tick
+
+    async def run():
+        client = MafiaBot()
+        lobby = GameLobby(14141, MockUser(99999, "Host"))
+        client.add_lobby(lobby)
+        view = lobby.get_view()
+        assert isinstance(view, GameView) and lobby.get_view() is view   # Built once, reused
+        assert view.is_persistent()
+        ids = {item.custom_id for item in view.children}
+        assert "mafia:14141:action_menu_btn" in ids and all(i.startswith("mafia:14141:") for i in ids)
+        assert view in client.persistent_views
+
+        # A second lobby gets its own, non-colliding IDs
+        other = GameLobby(15151, MockUser(99999, "Host"))
+        client.add_lobby(other)
+        assert not ids & {item.custom_id for item in other.get_view().children}
+
+        # Removing a lobby also drops its actor task, queued commands and render state
+        async def idle():
+            pass
+        client.lobby_tasks[14141] = asyncio.ensure_future(idle())
+        client.inboxes[14141].append(Tick('phase', 0))
+        client.renderer.bucket(14141).take()
+        client.renderer.last_payload[14141] = (1, "{}")
+        client.renderer.rendered_version[14141] = 3
+        assert client.remove_lobby(14141) is lobby
+        assert view.is_finished() and view not in client.persistent_views
+        assert 14141 not in client.lobbies and 14141 not in client.lobby_tasks and 14141 not in client.inboxes
+        assert not any(14141 in d for d in (client.renderer.buckets, client.renderer.last_payload,
+                                            client.renderer.rendered_version))
+        assert 15151 in client.lobbies
+
+    asyncio.run(run())
+    print("✅ persistent game view test passed")
+
+
+def test_early_advance_on_completion():
+    print("Testing event-driven early phase advancement...")
+    from bot import PhaseScheduler
+    lobby = GameLobby(16161, MockUser(99999, "Host"))
+    for uid, name in [(11111, "Alice"), (22222, "Bob"), (33333, "Carol")]:
+        lobby.players[uid] = Player(MockUser(uid, name))
+    lobby.attach_scheduler(PhaseScheduler())
+    lobby.start_game()
+    assert lobby.phase == 'night'
+
+    # No completion event until the last required night action arrives
+    required = lobby.actions_required['night']
+    for pid in required[:-1]:
+        lobby.actions_completed.add(pid)
+        lobby.request_check()
+        assert 'check' not in lobby.timer_marks
+    lobby.actions_completed.add(required[-1])
+    lobby.request_check()
+    assert lobby._check_phase_completion() and 'check' in lobby.timer_marks
+
+    lobby.phase = 'voting'
+    lobby._setup_voting()
+    lobby.votes[11111] = 22222
+    lobby.votes[22222] = 'SKIP'
+    assert not lobby._check_phase_completion()
+    lobby.votes[33333] = 22222
+    lobby.votes[99999] = 22222  # The host plays too
+    assert lobby._check_phase_completion()
+
+    # Bots are keyed by their own id, so their actions count toward completion
+    bots = GameLobby(17171, MockUser(99999, "Host"))
+    bots.add_bots(3)
+    assert all(pid == p.id for pid, p in bots.players.items())
+    print("✅ early advance test passed")
+
+
+def test_lobby_actor_applies_commands_in_order():
+    print("Testing the per-lobby command inbox...")
+    from bot import bot as mafia_bot, CastVote, EndPhase
+
+    class MockFollowup:
+        def __init__(self):
+            self.sent = []
+        async def send(self, content=None, ephemeral=False):
+            self.sent.append(content)
+
+    class MockInteraction:
+        def __init__(self):
+            self.followup = MockFollowup()
+
+    lobby = GameLobby(18181, MockUser(99999, "Host"))
+    for uid, name in [(11111, "Alice"), (22222, "Bob"), (33333, "Carol")]:
+        lobby.players[uid] = Player(MockUser(uid, name))
+    lobby.start_game()
+    lobby.phase = 'voting'
+    lobby._setup_voting()
+    ended = []
+
+    async def fake_end_phase(channel):
+        ended.append(lobby.phase)
+        lobby.phase = 'night'
+
+    lobby.host_end_phase = fake_end_phase
+    late = MockInteraction()
+
+    async def run():
+        mafia_bot.lobbies[lobby.channel_id] = lobby
+        try:
+            mafia_bot.post(lobby.channel_id, CastVote(11111, 22222))
+            mafia_bot.post(lobby.channel_id, EndPhase(None, lobby.round, 'voting'))
+            mafia_bot.post(lobby.channel_id, EndPhase(None, lobby.round, 'voting'))  # Double click
+            mafia_bot.post(lobby.channel_id, CastVote(22222, 11111, late))          # Arrives after the phase ended
+            # Handlers only enqueue: nothing has been applied yet
+            assert len(lobby.votes) == 0
+            await asyncio.gather(*mafia_bot.lobby_tasks.values())
+        finally:
+            mafia_bot.lobbies.clear()
+            mafia_bot.lobby_tasks.clear()
+
+    asyncio.run(run())
+    assert lobby.votes.get(11111) == 22222 and 22222 not in lobby.votes
+    assert ended == ['voting']           # Ended exactly once
+    assert late.followup.sent == ["❌ Voting has already closed."]
+    print("✅ lobby actor test passed")
+
+
+def test_lobby_setup_commands_use_the_inbox():
+    print("Testing join/add-bots/fast-forward commands through the inbox...")
+    from bot import bot as mafia_bot, Join, AddBots, SetFastForward
+
+    class MockFollowup:
+        def __init__(self):
+            self.sent = []
+        async def send(self, content=None, ephemeral=False):
+            self.sent.append((content, ephemeral))
+
+    class MockInteraction:
+        def __init__(self):
+            self.followup = MockFollowup()
+
+    lobby = GameLobby(19191, MockUser(99999, "Host"))
+    channel = MockChannel()
+    alice = MockUser(11111, "Alice")
+    first, again = MockInteraction(), MockInteraction()
+
+    async def run():
+        mafia_bot.lobbies[lobby.channel_id] = lobby
+        try:
+            mafia_bot.post(lobby.channel_id, Join(alice, channel, first))
+            mafia_bot.post(lobby.channel_id, Join(alice, channel, again))   # Double click
+            mafia_bot.post(lobby.channel_id, AddBots(2, 'auto', channel))    # Prefix command: reply in the channel
+            mafia_bot.post(lobby.channel_id, SetFastForward(True, channel))
+            assert len(lobby.players) == 1 and not lobby.fast_forward_enabled   # Only enqueued so far
+            await asyncio.gather(*mafia_bot.lobby_tasks.values())
+        finally:
+            mafia_bot.lobbies.clear()
+            mafia_bot.lobby_tasks.clear()
+
+    asyncio.run(run())
+    assert 11111 in lobby.players and len(lobby.players) == 4 and lobby.fast_forward_enabled
+    assert first.followup.sent == [("✅ **Alice** joined! (2 players now)", False)]
+    assert again.followup.sent == [("You are already in the lobby.", True)]
+    assert "✅ Added 2 bot(s) in auto mode." in channel.messages
+    print("✅ lobby setup command test passed")
+
+
+def test_narrator_timeout_prefetch_and_fallback():
+    print("Testing async narration service...")
+    from bot import Narrator, StubNarrationClient, FALLBACK_INTROS
+
+    async def run():
+        # Healthy model: text comes from the client
+        client = StubNarrationClient(["A body in the alley."])
+        narrator = Narrator(client, timeout=1.0)
+        assert await narrator._model_text("dawn 2") == "A body in the alley."
+        assert client.calls == 1
+
+        # Slow or failing models give no text (callers use local lines) without blocking the loop
+        slow = Narrator(StubNarrationClient(delay=0.5), timeout=0.05)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        t = asyncio.create_task(ticker())
+        assert await slow._model_text("dawn") is None
+        t.cancel()
+        assert slow.timeouts == 1 and ticks >= 2
+        failing = Narrator(StubNarrationClient(fail=True))
+        assert await failing._model_text("dawn") is None and failing.failures == 1
+        assert await Narrator(None)._model_text("dawn") is None
+        assert Narrator(None).dawn_intro(2) in FALLBACK_INTROS
+
+    asyncio.run(run())
+    print("✅ narrator test passed")
+
+
+def test_narration_cache_and_intro_pool():
+    print("Testing narration LRU/TTL cache and intro pools...")
+    import time as _time
+    from collections import deque
+    from bot import NarrationCache, Narrator, StubNarrationClient, FALLBACK_INTROS, intro_stage
+    from bot import DAWN_INTRO_TEMPLATE, NARRATION_CACHE_TTL
+
+    cache = NarrationCache(maxsize=2, ttl=10)
+    cache.put('a', 1, now=0)
+    cache.put('b', 2, now=0)
+    assert cache.get('a', now=1) == 1       # 'a' is now most recently used
+    cache.put('c', 3, now=1)                # Evicts 'b'
+    assert 'b' not in cache and len(cache) == 2
+    assert cache.get('a', now=20) is None   # Expired
+    assert 'a' not in cache
+
+    assert intro_stage(2) == intro_stage(1) != intro_stage(3)
+    assert intro_stage(3) == intro_stage(4) != intro_stage(9)
+
+    async def run():
+        client = StubNarrationClient(["1. Rain on the docks.\n2. A scream at dawn.\n3. Blood on the snow.\n4. Quiet streets."])
+        narrator = Narrator(client, pool_target=4, pool_low=2)
+        # Empty pool: answer instantly from the fallback lines and refill in the background
+        assert narrator.dawn_intro(2) in FALLBACK_INTROS
+        await asyncio.gather(*narrator.refills.values())
+        assert client.calls == 1
+        served = [narrator.dawn_intro(2), narrator.dawn_intro(1)]   # Same round bucket
+        assert served == ["Rain on the docks.", "A scream at dawn."]
+        await asyncio.gather(*narrator.refills.values())
+        assert client.calls == 1                                    # Pool still at the low mark
+        assert narrator.dawn_intro(2) == "Blood on the snow."
+        await asyncio.gather(*narrator.refills.values())            # Dropped below it: one batched refill
+        assert client.calls == 2
+        # A different bucket has its own pool
+        narrator.prefetch(7)
+        await asyncio.gather(*narrator.refills.values())
+        assert narrator.dawn_intro(7) == "Rain on the docks." and client.calls == 3
+        # A refill restarts the pool's TTL, so a batch fetched just now isn't evicted on the old clock
+        key = (DAWN_INTRO_TEMPLATE, intro_stage(9))
+        narrator.cache.put(key, deque(), now=_time.time() - NARRATION_CACHE_TTL + 1)
+        await narrator._fill(key)
+        assert len(narrator.cache.get(key, now=_time.time() + 60)) == 4
+        # Only list numbering is stripped, not digits that start the sentence
+        numbered = Narrator(StubNarrationClient(["1) 3 a.m. and the docks are silent.\n- 12 bells.\n\n• Fog."]), pool_target=3)
+        await numbered._fill(key)
+        assert list(numbered._pool(key)) == ["3 a.m. and the docks are silent.", "12 bells.", "Fog."]
+
+    asyncio.run(run())
+    print("✅ narration cache test passed")
+
+
+def test_headless_simulation():
+    print("Testing headless bot-only games...")
+    from simulation import run_game
+
+    result = run_game(7, seed=42, transcript=True)
+    assert result['winner'] in ('villager', 'mafia')
+    assert result['players'] == 7 and result['rounds'] >= 1
+    # Events are plain (kind, text) pairs; no Discord objects anywhere
+    assert result['events'] and all(kind in ('announce', 'panel') for kind, _ in result['events'])
+    assert result['events'][-1][0] in ('panel', 'announce') and "WINS" in "".join(t or "" for _, t in result['events'][-2:])
+    # Same seed, same game
+    assert run_game(7, seed=42, transcript=True) == result
+    for count in (3, 12, 20):
+        assert run_game(count, seed=count)['winner'] is not None
+    print("✅ headless simulation test passed")
+
+
+def test_lobby_rng_replay():
+    print("Testing per-lobby seeded RNG...")
+    from bot import LobbyRNG
+    from simulation import run_game
+
+    rng = LobbyRNG(7)
+    first = [rng.random() for _ in range(300)] + list(rng.uniform(0, 1, size=5)) + [rng.choice("abc")]
+    items = list(range(10))
+    rng.shuffle(items)
+    rng.reset()
+    replay = [rng.random() for _ in range(300)] + list(rng.uniform(0, 1, size=5)) + [rng.choice("abc")]
+    replay_items = list(range(10))
+    rng.shuffle(replay_items)
+    assert first == replay and items == replay_items and sorted(items) == list(range(10))
+    assert all(0 <= v < 1 for v in first[:300]) and 0 <= rng.randrange(3) < 3
+
+    # Games replay from the lobby seed alone, whatever the module RNG is doing
+    random.seed(1)
+    game = run_game(8, seed=123, transcript=True)
+    random.seed(2)
+    assert run_game(8, seed=123, transcript=True) == game
+    lobby = GameLobby(1, MockUser(99999, "Host"), seed=5)
+    assert lobby.rng.seed == 5 and GameLobby(2).rng.seed != GameLobby(3).rng.seed
+    print("✅ lobby RNG test passed")
+
+
+def test_balance_runner_statistics():
+    print("Testing Monte Carlo balance runner...")
+    from simulation import wilson_interval, mean_interval, run_configs, parse_range, parse_weight_axes
+    from bot import WEIGHTS, ROLE_SETUP
+
+    low, high = wilson_interval(50, 100)
+    assert abs(low - 0.4038) < 1e-3 and abs(high - 0.5962) < 1e-3
+    assert wilson_interval(0, 10)[0] == 0.0 and wilson_interval(0, 0) == (0.0, 1.0)
+    mean, half = mean_interval(6.0, 14.0, 3)   # values 1, 2, 3
+    assert mean == 2.0 and abs(half - 1.96 * (1 / 3 ** 0.5)) < 1e-9
+
+    assert parse_range("5-7,9") == [5, 6, 7, 9]
+    assert parse_weight_axes(["VOTE_BAD=0.1,0.2", "BANDWAGON=0.3"]) == [
+        {'VOTE_BAD': 0.1, 'BANDWAGON': 0.3}, {'VOTE_BAD': 0.2, 'BANDWAGON': 0.3}]
+
+    configs = [(6, WEIGHTS, ROLE_SETUP), (9, WEIGHTS, ROLE_SETUP)]
+    serial = run_configs(configs, 20, workers=1, batch_size=7)
+    pooled = run_configs(configs, 20, workers=2, batch_size=7)
+    assert serial == pooled   # Seeded batches: same games whichever process plays them
+    for summary in serial:
+        assert summary['games'] == 20 and 0 <= summary['town_win_rate'] <= 1
+        assert summary['rounds'] >= 1 and 0 <= summary['accuracy'] <= 1
+    print("✅ balance runner test passed")
+
+
+def test_weights_tuner_checkpoint_and_profile():
+    print("Testing WEIGHTS tuner...")
+    import json, os, tempfile
+    import tuner
+    from bot import WEIGHTS, load_weights_profile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = os.path.join(tmp, 'ckpt.json')
+        profile = os.path.join(tmp, 'profile.json')
+        args = ['--games', '6', '--players', '6', '--workers', '1']
+        tuner.main(args + ['--population', '4', '--checkpoint', checkpoint, '--out', profile, '--generations', '1'])
+        state = json.load(open(checkpoint))
+        assert state['generation'] == 1 and len(state['history']) == 1
+        # Resuming continues from the checkpoint and replays the same candidates as a straight run
+        tuner.main(['--resume', checkpoint, '--generations', '2', '--checkpoint', checkpoint, '--out', profile] + args)
+        resumed = json.load(open(checkpoint))
+        straight = os.path.join(tmp, 'straight.json')
+        tuner.main(args + ['--population', '4', '--checkpoint', straight, '--out', profile, '--generations', '2'])
+        assert resumed['generation'] == 2 and resumed['mean'] == json.load(open(straight))['mean']
+        # The checkpoint fixes the search setup, so resuming rejects flags that would change it
+        for flag in (['--population', '8'], ['--keys', 'VOTE_BAD'], ['--seed', '1']):
+            try:
+                tuner.main(['--resume', checkpoint] + flag)
+            except SystemExit as exc:
+                assert exc.code == 2
+            else:
+                raise AssertionError(f"{flag[0]} accepted with --resume")
+
+        tuned = json.load(open(profile))
+        for key, (low, high) in tuner.TUNING_BOUNDS.items():
+            assert low <= tuned[key] <= high
+        assert tuned['NOISE_MULTIPLIER_MIN'] <= tuned['NOISE_MULTIPLIER_MAX']
+
+        json.dump({'VOTE_BAD': 0.5, 'NOT_A_WEIGHT': 1}, open(profile, 'w'))
+        weights = load_weights_profile(profile, dict(WEIGHTS))
+        assert weights['VOTE_BAD'] == 0.5 and 'NOT_A_WEIGHT' not in weights
+        assert WEIGHTS['VOTE_BAD'] == 0.25   # Module defaults untouched
+    print("✅ weights tuner test passed")
+
+
+def test_suspicion_driven_bot_policy():
+    print("Testing suspicion-driven bot policy...")
+    from simulation import build_lobby
+    from bot import BASELINE_SUSPICION
+
+    lobby = build_lobby(6, seed=3)
+    lobby.start_game()
+    ids = list(lobby.players)
+    role_of = {pid: lobby.players[pid].role for pid in ids}
+    mafia = [pid for pid in ids if role_of[pid] == 'mafia']
+    doctor = next(pid for pid in ids if role_of[pid] == 'doctor')
+    town = [pid for pid in ids if role_of[pid] != 'mafia']
+    matrix = lobby.suspicion_matrix
+    for obs in ids:
+        for target in ids:
+            if obs != target:
+                matrix.set(obs, target, 0 if role_of[obs] == role_of[target] == 'mafia' else 40)
+    prime, trusted = town[-1], town[0]
+    for obs in ids:
+        if obs != prime:
+            matrix.set(obs, prime, 90)
+        if obs != trusted:
+            matrix.set(obs, trusted, 10)
+
+    # Night: mafia never pick a teammate, the doctor protects the most trusted player
+    for _ in range(20):
+        plan = lobby.plan_bot_actions(ids)
+        assert all(plan[m] not in mafia for m in mafia)
+        assert plan[doctor] == (trusted if doctor != trusted else plan[doctor])
+        assert not any(pid in plan for pid in ids if role_of[pid] == 'villager')
+
+    # Discussion: accuse the top suspect (one of the top two), defend the trusted
+    lobby.phase = 'discussion'
+    plan = lobby.plan_bot_actions(ids)
+    # Mafia defend from the public read too, so a defense never gives a teammate away
+    for pid in ids:
+        assert plan[pid] in (('accuse', prime), ('defend', trusted), ('skip', None)), (pid, plan[pid])
+    assert ('accuse', prime) in plan.values() and ('defend', trusted) in plan.values()
+    lobby.run_bot_actions()
+    assert lobby.discussion_events and lobby.accusation_count
+
+    # Voting: everyone converges on the standout suspect
+    lobby.phase = 'voting'
+    plan = lobby.plan_bot_actions(ids)
+    assert all(plan[pid] == prime for pid in ids if pid != prime)
+    assert lobby.get_bot_action(ids[0], list(lobby.players.values())) == plan[ids[0]]
+
+    # The public read ignores hidden roles: swapping who holds mafia leaves a town vote alone
+    # (a role-aware read would drop a's row before the swap and b's row after it)
+    voter, b, c, d = town[:4]
+    a = mafia[0]
+    for obs in ids:
+        for target in ids:
+            if obs != target:
+                matrix.set(obs, target, 40)
+    matrix.set(a, c, 99)
+    matrix.set(b, d, 95)
+    lobby.rng.reset(5)
+    before = lobby.plan_bot_actions([voter])[voter]
+    lobby.players[a].role, lobby.players[b].role = role_of[b], role_of[a]
+    lobby.rng.reset(5)
+    assert lobby.plan_bot_actions([voter])[voter] == before
+    lobby.players[a].role, lobby.players[b].role = role_of[a], role_of[b]
+
+    # Nobody left to speak for the room: baseline rather than an all-NaN mean
+    import math
+    import warnings
+    for pid in town:
+        lobby.mark_dead(lobby.players[pid])
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', RuntimeWarning)
+        assert all(math.isfinite(v) for v in lobby.public_suspicion(mafia))
+        plan = lobby.plan_bot_actions(ids)
+        assert all(plan[m] == 'SKIP' for m in mafia)   # Nobody but teammates left to vote for
+        for pid in mafia[1:]:
+            lobby.mark_dead(lobby.players[pid])
+        assert lobby.public_suspicion(mafia[:1])[0] == BASELINE_SUSPICION
+    print("✅ bot policy test passed")
+
+
+def test_staggered_bot_schedule():
+    print("Testing staggered bot action scheduling...")
+    import time as _time
+    from simulation import build_lobby
+    from bot import BOT_ACTION_MIN_DELAY, BOT_ACTION_DEADLINE_SHARE, PHASE_DURATION
+
+    lobby = build_lobby(9, seed=11)
+    lobby.players[99999] = Player(MockUser(99999, "Host"))  # Someone is watching: no fast-forward
+    start = _time.time()
+    lobby.start_game()   # New phase deadline plans the night's bot actions
+    acting = [pid for pid, p in lobby.players.items() if p.is_bot and p.role != 'villager']
+    agenda = list(lobby.bot_agenda)
+    assert sorted(pid for _, pid in agenda) == sorted(acting)
+    whens = [when for when, _ in agenda]
+    assert whens == sorted(whens) and lobby.timer_marks['bots'] == whens[0]
+    assert all(start + BOT_ACTION_MIN_DELAY - 0.1 <= w <= _time.time() + BOT_ACTION_DEADLINE_SHARE * PHASE_DURATION['night']
+               for w in whens)
+
+    # Only due bots act; the tick moves on to the next planned action
+    lobby.run_due_bot_actions(now=whens[0])
+    assert lobby.actions_completed == {agenda[0][1]}
+    assert lobby.timer_marks['bots'] == whens[1]
+    lobby.run_due_bot_actions(now=whens[-1])
+    assert lobby.actions_completed == set(acting) and not lobby.bot_agenda
+
+    # The next phase replans everyone who is still alive
+    lobby.submit_night_action(99999, next(pid for pid in lobby.players if pid != 99999))
+    lobby.advance_phase_rules()
+    if lobby.status == 'in-game':
+        assert lobby.phase == 'discussion'
+        assert sorted(pid for _, pid in lobby.bot_agenda) == sorted(p.id for p in lobby.players.values() if p.is_alive and p.is_bot)
+    print("✅ staggered bot schedule test passed")
+
+
+def test_bot_only_fast_forward():
+    print("Testing bot-only fast-forward...")
+    import time as _time
+    from bot import bot as mafia_bot, PhaseScheduler
+
+    async def play(lobby):
+        channel = MockChannel()
+        original_get_channel, original_scheduler = mafia_bot.get_channel, mafia_bot.scheduler
+        mafia_bot.get_channel = lambda cid: channel
+        mafia_bot.scheduler = PhaseScheduler()   # Its wakeup event belongs to this test's event loop
+        mafia_bot.add_lobby(lobby)
+        loop_task = asyncio.create_task(mafia_bot.game_loop())
+        try:
+            lobby.start_game()
+            started = _time.time()
+            while lobby.status == 'in-game' and _time.time() - started < 10:
+                await asyncio.sleep(0.02)
+        finally:
+            loop_task.cancel()
+            mafia_bot.remove_lobby(lobby.channel_id)
+            mafia_bot.get_channel, mafia_bot.scheduler = original_get_channel, original_scheduler
+        return channel, _time.time() - started
+
+    # No humans in the game: full-length phase timers are skipped entirely
+    watched = GameLobby(19191, MockUser(99999, "Host"))
+    watched.add_bots(5, 'auto')
+    del watched.players[99999]   # The host only watches
+    assert watched.fast_forward
+    channel, elapsed = asyncio.run(play(watched))
+    assert watched.status == 'finished' and elapsed < 5
+    # One summary plus the final panel instead of a message per event
+    assert len(channel.messages) == 2 and channel.messages[0].startswith("⏩ **Fast-forwarded game**")
+    assert all(f"Round {r}:" in channel.messages[0] for r, _, _ in watched.death_log)
+
+    # A dead human keeps a normal game normal: spectators still get the feed
+    spectated = GameLobby(20202, MockUser(99999, "Host"))
+    spectated.add_bots(4, 'auto')
+    spectated.start_game()
+    spectated.mark_dead(spectated.players[99999])
+    assert not spectated.fast_forward
+
+    # Host-enabled mid-phase: bots are replanned at once, humans with a night role are still waited for
+    hosted = GameLobby(21212, MockUser(99999, "Host"))
+    hosted.add_bots(5, 'manual')
+    hosted.start_game()
+    assert not hosted.fast_forward and not hosted.bot_agenda   # Manual bots wait for the host
+    hosted.set_fast_forward(True)
+    assert hosted.bot_agenda and all(when <= _time.time() for when, _ in hosted.bot_agenda)
+    hosted.run_due_bot_actions()
+    host_acts = 99999 in hosted.actions_required['night']
+    assert hosted._check_phase_completion() == (not host_acts)
+    if host_acts:
+        hosted.submit_night_action(99999, next(pid for pid in hosted.players if pid != 99999))
+        assert 'check' in hosted.timer_marks
+    hosted.advance_phase_rules()
+    assert not any("failed to act" in line for line in hosted.logs)   # Nobody kicked for the bots' speed
+    if hosted.status == 'in-game':
+        # Talk and votes don't wait for the host; announcements still reach the humans, panels don't
+        hosted.run_due_bot_actions()
+        assert hosted._check_phase_completion()
+        channel = MockChannel()
+        hosted.events = [('announce', "news"), ('panel', "panel")]
+        asyncio.run(hosted.flush_events(channel))
+        assert channel.messages == ["news"]
+    print("✅ fast-forward test passed")
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+WEIGHTS tuner driven by simulated games.
+
+A small evolution strategy (diagonal Gaussian, CMA-style mean/step-size
+updates) searches the suspicion engine's WEIGHTS. Every candidate is
+scored on batches of headless games (simulation.run_configs, spread over
+worker processes): high suspicion accuracy is rewarded, drifting away
+from a 50/50 faction win rate is penalized. All candidates of a
+generation play the same seeds, so they are compared on identical games.
+
+State is checkpointed after every generation and can be resumed; the best
+weights found so far are written as a profile the bot loads at startup
+(WEIGHTS_PROFILE, see bot.load_weights_profile):
+
+    python tuner.py --generations 30 --population 16 --games 400 --out weights_profile.json
+    python tuner.py --resume tuner_checkpoint.json --generations 60
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from bot import ROLE_SETUP, WEIGHTS
+from simulation import run_configs
+
+# Search bounds per weight; candidates are clipped into these. Only weights
+# the engine reads are listed, the others would just drift. VINDICATION and
+# COMPLICITY are left out too: the engine only applies them as self-beliefs,
+# which update_belief ignores, so no value of theirs can change a game.
+TUNING_BOUNDS = {
+    'VOTE_BAD': (0.0, 1.0),
+    'HYPOCRISY': (0.0, 1.0),
+    'CONSISTENCY': (-1.0, 0.0),
+    'BANDWAGON': (0.0, 1.0),
+    'NOISE_MULTIPLIER_MIN': (0.1, 1.0),
+    'NOISE_MULTIPLIER_MAX': (1.0, 2.0),
+    'MISINTERPRETATION_CHANCE': (0.0, 0.3),
+    'CONFIRMATION_BIAS_HIGH': (1.0, 2.5),
+    'CONFIRMATION_BIAS_LOW': (0.1, 1.0),
+    'MEMORY_DECAY': (0.5, 1.0),
+    'INTUITION_LEAK': (0.0, 1.0),
+}
+
+DEFAULT_KEYS = list(TUNING_BOUNDS)
+
+BALANCE_PENALTY = 2.0  # Score lost per unit of |town win rate - 0.5|
+INITIAL_STEP = 0.25    # Initial step size as a fraction of each weight's range
+MIN_STEP = 0.01
+
+
+def score(summaries, balance_penalty=BALANCE_PENALTY):
+    """Mean over player counts of accuracy - penalty * |town win rate - 0.5| (higher is better)."""
+    return float(np.mean([s['accuracy'] - balance_penalty * abs(s['town_win_rate'] - 0.5) for s in summaries]))
+
+
+class Tuner:
+    """(mu, lambda) evolution strategy over a subset of WEIGHTS, in normalized [0, 1] coordinates."""
+    def __init__(self, keys=None, population=16, seed=0, base_weights=None):
+        self.keys = list(keys or DEFAULT_KEYS)
+        self.population = population
+        self.parents = max(2, population // 4)
+        self.seed = seed
+        base = dict(base_weights or WEIGHTS)
+        self.base = base
+        low, high = self._bounds()
+        self.mean = (np.array([base[k] for k in self.keys], dtype=np.float64) - low) / (high - low)
+        self.step = np.full(len(self.keys), INITIAL_STEP)
+        self.generation = 0
+        self.best = {'score': None, 'weights': dict(base)}
+        self.history = []
+
+    def _bounds(self):
+        low = np.array([TUNING_BOUNDS[k][0] for k in self.keys])
+        high = np.array([TUNING_BOUNDS[k][1] for k in self.keys])
+        return low, high
+
+    def weights_for(self, point):
+        low, high = self._bounds()
+        values = low + np.clip(point, 0.0, 1.0) * (high - low)
+        weights = dict(self.base)
+        weights.update({k: round(float(v), 4) for k, v in zip(self.keys, values)})
+        if weights['NOISE_MULTIPLIER_MIN'] > weights['NOISE_MULTIPLIER_MAX']:
+            weights['NOISE_MULTIPLIER_MIN'], weights['NOISE_MULTIPLIER_MAX'] = \
+                weights['NOISE_MULTIPLIER_MAX'], weights['NOISE_MULTIPLIER_MIN']
+        return weights
+
+    def ask(self):
+        """This generation's candidate points (deterministic per seed and generation, so resumes replay exactly)."""
+        rng = np.random.default_rng([self.seed, self.generation])
+        points = self.mean + self.step * rng.standard_normal((self.population, len(self.keys)))
+        points[0] = self.mean  # Always re-score the current mean
+        return np.clip(points, 0.0, 1.0)
+
+    def tell(self, points, scores):
+        """Move the mean toward the best candidates and adapt per-weight step sizes to their spread."""
+        order = np.argsort(scores)[::-1][:self.parents]
+        ranks = np.log(self.parents + 0.5) - np.log(np.arange(1, self.parents + 1))
+        ranks /= ranks.sum()
+        elite = points[order]
+        new_mean = ranks @ elite
+        spread = np.sqrt(ranks @ (elite - self.mean) ** 2)
+        self.step = np.clip(0.7 * self.step + 0.3 * spread, MIN_STEP, 0.5)
+        self.mean = new_mean
+        top = int(order[0])
+        if self.best['score'] is None or scores[top] > self.best['score']:
+            self.best = {'score': float(scores[top]), 'weights': self.weights_for(points[top])}
+        self.history.append({'generation': self.generation, 'best': float(scores[top]), 'mean_score': float(np.mean(scores))})
+        self.generation += 1
+
+    def state(self):
+        return {
+            'keys': self.keys, 'population': self.population, 'seed': self.seed, 'base': self.base,
+            'mean': self.mean.tolist(), 'step': self.step.tolist(), 'generation': self.generation,
+            'best': self.best, 'history': self.history,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        tuner = cls(state['keys'], state['population'], state['seed'], state['base'])
+        tuner.mean = np.array(state['mean'])
+        tuner.step = np.array(state['step'])
+        tuner.generation = state['generation']
+        tuner.best = state['best']
+        tuner.history = state['history']
+        return tuner
+
+
+def write_json(path, data):
+    """Write atomically so an interrupted run never leaves a truncated checkpoint or profile."""
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def evaluate(tuner, points, player_counts, games, workers=None):
+    """Score every candidate on the same seeds (all candidates x player counts in one pool run)."""
+    configs = [(players, tuner.weights_for(point), ROLE_SETUP) for point in points for players in player_counts]
+    summaries = run_configs(configs, games, workers=workers, seed=tuner.seed * 1_000_000 + tuner.generation * games)
+    per_candidate = len(player_counts)
+    return np.array([score(summaries[i:i + per_candidate]) for i in range(0, len(summaries), per_candidate)])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tune suspicion WEIGHTS with simulated games.")
+    parser.add_argument('--generations', type=int, default=20, help="stop after this many generations in total")
+    parser.add_argument('--population', type=int, help="candidates per generation (default: 16)")
+    parser.add_argument('--games', type=int, default=400, help="games per candidate and player count")
+    parser.add_argument('--players', default='5,7,9,12', help="player counts each candidate is scored on")
+    parser.add_argument('--keys', nargs='+', choices=sorted(TUNING_BOUNDS), help="weights to tune")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--seed', type=int, help="search seed (default: 0)")
+    parser.add_argument('--checkpoint', default='tuner_checkpoint.json')
+    parser.add_argument('--resume', metavar='CHECKPOINT', help="continue from a checkpoint file")
+    parser.add_argument('--out', default='weights_profile.json', help="tuned weights profile for the bot")
+    args = parser.parse_args(argv)
+
+    if args.resume:
+        fixed = [flag for flag, value in (('--keys', args.keys), ('--population', args.population), ('--seed', args.seed))
+                 if value is not None]
+        if fixed:
+            parser.error(f"{', '.join(fixed)} cannot be changed when resuming; the checkpoint sets them")
+        with open(args.resume) as f:
+            tuner = Tuner.from_state(json.load(f))
+        print(f"Resuming at generation {tuner.generation} (best score {tuner.best['score']})")
+    else:
+        tuner = Tuner(args.keys, args.population or 16, args.seed or 0)
+    player_counts = [int(p) for p in args.players.split(',')]
+
+    while tuner.generation < args.generations:
+        started = time.time()
+        points = tuner.ask()
+        scores = evaluate(tuner, points, player_counts, args.games, args.workers)
+        tuner.tell(points, scores)
+        write_json(args.checkpoint, tuner.state())
+        write_json(args.out, tuner.best['weights'])
+        print(f"gen {tuner.generation:3d}  best {scores.max():+.4f}  mean {scores.mean():+.4f}  "
+              f"overall best {tuner.best['score']:+.4f}  ({time.time() - started:.1f}s)")
+
+    print(f"Best weights written to {args.out}")
+
+
+if __name__ == '__main__':
+    main()